@@ -1,19 +1,37 @@
+import os
 import re
+import json
 import pandas as pd
-from transformers import pipeline
+from inference_cache import InferenceCache
+from rule_matcher import RuleMatcher
 
 # === CONFIG ===
 DATA_PATH = r"A:\Infosys\data\processed\preprocessed_fiqa.csv"
 OUTPUT_PATH = r"A:\Infosys\outputs\financial_events_extracted.csv"
+BATCH_MODE = True        # batch the zero-shot fallback instead of one call per row
+BATCH_SIZE = 64          # sentence x label hypotheses per forward pass
+SCORE_THRESHOLD = 0.6
+ZERO_SHOT_MODEL = "facebook/bart-large-mnli"
+CACHE_PATH = r"A:\Infosys\outputs\cache\zero_shot_events.sqlite"  # set to None to disable
+CACHE_MAX_ENTRIES = 500_000
 
-# === Load dataset ===
-df = pd.read_csv(DATA_PATH)
+# --- Streaming: read the input in chunks, append results, resume after a crash ---
+STREAMING = True
+CHUNK_SIZE = 2000                                   # input rows per chunk
+CHECKPOINT_PATH = OUTPUT_PATH + ".checkpoint.json"
+OUTPUT_COLUMNS = ["text", "detected_event", "sentiment"]
 
-# === Zero-Shot Classifier (for event type detection) ===
-event_classifier = pipeline(
-    "zero-shot-classification",
-    model="facebook/bart-large-mnli"
-)
+# --- Multi-core: >1 shards the input across a process pool (one model per worker) ---
+NUM_WORKERS = 1
+THREADS_PER_WORKER = None   # None = cpu_count // NUM_WORKERS
+
+# --- Model fallback: "zero-shot" (bart-large-mnli, one NLI pass per label)
+#     or "embedding" (bi-encoder, one pass per sentence) ---
+EVENT_MODE = "zero-shot"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_THRESHOLD = 0.35   # cosine-similarity counterpart of SCORE_THRESHOLD
+EMBEDDING_BATCH_SIZE = 128
+LABEL_EMBEDDINGS_PATH = r"A:\Infosys\outputs\cache\event_label_embeddings.pt"
 
 # --- Define event labels ---
 EVENT_LABELS = [
@@ -41,47 +59,248 @@ EVENT_PATTERNS = {
     "partnership announcement": r"\b(partnership|collaboration|deal signed)\b"
 }
 
+# --- All rules compiled into one single-pass matcher (case-insensitive;
+#     01_preprocess_fiqa.py already reduces text to ASCII) ---
+EVENT_RULES = RuleMatcher(EVENT_PATTERNS, flags=re.IGNORECASE | re.ASCII)
+
+# --- Models and cache are created on first use ---
+_event_classifier = None
+_embedding_classifier = None
+_cache = None
+
+
+def get_event_classifier():
+    """Zero-Shot Classifier (for event type detection)."""
+    global _event_classifier
+    if _event_classifier is None:
+        from transformers import pipeline
+        _event_classifier = pipeline(
+            "zero-shot-classification",
+            model=ZERO_SHOT_MODEL
+        )
+    return _event_classifier
+
+
+def get_embedding_classifier():
+    """Bi-encoder alternative to the zero-shot classifier."""
+    global _embedding_classifier
+    if _embedding_classifier is None:
+        from label_embeddings import LabelEmbeddingClassifier
+        _embedding_classifier = LabelEmbeddingClassifier(
+            EMBEDDING_MODEL, EVENT_LABELS,
+            threshold=EMBEDDING_THRESHOLD,
+            batch_size=EMBEDDING_BATCH_SIZE,
+            cache_path=LABEL_EMBEDDINGS_PATH
+        )
+    return _embedding_classifier
+
+
+def get_cache():
+    """Persistent cache of zero-shot results (scores for all labels are stored,
+    so changing SCORE_THRESHOLD does not invalidate it)."""
+    global _cache
+    if _cache is None and CACHE_PATH:
+        _cache = InferenceCache(CACHE_PATH, ZERO_SHOT_MODEL, EVENT_LABELS, CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def detect_rule_events(text):
+    """
+    Regex rule pass only. Returns the set of matched event types.
+    """
+    return EVENT_RULES.labels(text)
+
+
+def zero_shot_results(texts, batch_size=BATCH_SIZE, use_cache=True):
+    """
+    Full zero-shot output ({'labels', 'scores'}) for every text, in input order.
+    Cached sentences are answered from disk; the rest are deduplicated and
+    sorted by token length so each batch of sentence x label hypotheses is
+    padded only to its own longest member.
+    """
+    if not texts:
+        return []
+    cache = get_cache() if use_cache else None
+    results = cache.get_many(texts) if cache is not None else [None] * len(texts)
+    # uncached positions grouped by text, so repeated sentences go through the model once
+    todo = {}
+    for i, res in enumerate(results):
+        if res is None:
+            todo.setdefault(texts[i], []).append(i)
+
+    if todo:
+        event_classifier = get_event_classifier()
+        todo_texts = list(todo)
+        lengths = [len(ids) for ids in event_classifier.tokenizer(todo_texts, add_special_tokens=False)["input_ids"]]
+        order = sorted(range(len(todo_texts)), key=lambda j: lengths[j])
+
+        outputs = event_classifier([todo_texts[j] for j in order], EVENT_LABELS, batch_size=batch_size)
+        if isinstance(outputs, dict):
+            outputs = [outputs]
+        fresh = [None] * len(todo_texts)
+        for j, res in zip(order, outputs):
+            fresh[j] = {'labels': res['labels'], 'scores': res['scores']}
+            for i in todo[todo_texts[j]]:
+                results[i] = fresh[j]
+        if cache is not None:
+            cache.put_many(todo_texts, fresh)
+    return results
+
+
+def classify_events_batched(texts):
+    """
+    Model fallback for many sentences at once, using EVENT_MODE.
+    Returns the top label per text, or None when its score does not clear
+    the mode's threshold.
+    """
+    if EVENT_MODE == "embedding":
+        return get_embedding_classifier().predict(texts)
+    labels = []
+    for res in zero_shot_results(texts):
+        labels.append(res['labels'][0] if res['scores'][0] > SCORE_THRESHOLD else None)
+    return labels
+
 
 def detect_event_type(text):
     """
     Uses both regex rules and zero-shot classification to detect event types.
     """
-    text_lower = text.lower()
-    detected_events = set()
-
     # --- 1. Rule-based matching ---
-    for event, pattern in EVENT_PATTERNS.items():
-        if re.search(pattern, text_lower):
-            detected_events.add(event)
+    detected_events = detect_rule_events(text)
 
     # --- 2. Model-based classification (optional, for more complex sentences) ---
     if not detected_events:
-        res = event_classifier(text, EVENT_LABELS)
-        if res['scores'][0] > 0.6:
-            detected_events.add(res['labels'][0])
+        label = classify_events_batched([text])[0]
+        if label:
+            detected_events.add(label)
 
     return list(detected_events)
 
 
-# --- Process dataset ---
-extracted_rows = []
+def extract_events(df):
+    """Rule pass plus model fallback over a frame with 'text' and 'label' columns."""
+    texts = df['text'].astype(str).tolist()
+    sentiments = df['label'].tolist()
+
+    if BATCH_MODE:
+        # 1. Rule pass over everything, 2. one batched model pass over the misses
+        row_events = EVENT_RULES.labels_series(df['text']).tolist()
+        misses = [i for i, events in enumerate(row_events) if not events]
+        print(f"🔹 {len(texts) - len(misses)} sentences matched rules, {len(misses)} go to the {EVENT_MODE} model")
+        for i, label in zip(misses, classify_events_batched([texts[i] for i in misses])):
+            if label:
+                row_events[i].add(label)
+        row_events = [list(events) for events in row_events]
+    else:
+        row_events = [detect_event_type(t) for t in texts]
 
-for idx, row in df.iterrows():
-    text = row['text']
-    events = detect_event_type(text)
-    if events:
+    extracted_rows = []
+    for text, sentiment, events in zip(texts, sentiments, row_events):
         for event in events:
             extracted_rows.append({
                 "text": text,
                 "detected_event": event,
-                "sentiment": row['label']
+                "sentiment": sentiment
             })
+    return extracted_rows
+
+
+def events_frame(df):
+    """extract_events as a DataFrame; the per-shard function for the sharded runner."""
+    return pd.DataFrame(extract_events(df), columns=OUTPUT_COLUMNS)
+
+
+def warm_up_worker():
+    """Loads the fallback model once per worker process."""
+    if EVENT_MODE == "embedding":
+        get_embedding_classifier()
+    else:
+        get_event_classifier()
+
+
+def load_checkpoint(data_path, output_path):
+    """Checkpoint of a previous, unfinished run over the same input, or None."""
+    if not os.path.exists(CHECKPOINT_PATH) or not os.path.exists(output_path):
+        return None
+    with open(CHECKPOINT_PATH, "r", encoding="utf-8") as f:
+        ckpt = json.load(f)
+    if ckpt.get("input") != data_path or os.path.getsize(output_path) < ckpt["output_bytes"]:
+        return None
+    return ckpt
+
+
+def save_checkpoint(ckpt):
+    # write-then-rename so a crash never leaves a half-written checkpoint
+    tmp_path = CHECKPOINT_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(ckpt, f)
+    os.replace(tmp_path, CHECKPOINT_PATH)
+
+
+def extract_events_streaming(data_path, output_path, chunk_size=CHUNK_SIZE):
+    """
+    Chunked version of extract_events: results are appended to output_path
+    after every chunk and the number of input rows done is checkpointed, so
+    memory stays flat and a restarted run continues where the last one stopped.
+    """
+    ckpt = load_checkpoint(data_path, output_path)
+    if ckpt:
+        # drop anything appended after the last checkpoint was written
+        with open(output_path, "r+b") as f:
+            f.truncate(ckpt["output_bytes"])
+        print(f"🔁 Resuming after row {ckpt['rows_done']} ({ckpt['events']} events already saved)")
+    else:
+        pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(output_path, index=False)
+        ckpt = {"input": data_path, "rows_done": 0, "events": 0,
+                "output_bytes": os.path.getsize(output_path)}
+        save_checkpoint(ckpt)
+
+    reader = pd.read_csv(data_path, chunksize=chunk_size, skiprows=range(1, ckpt["rows_done"] + 1))
+    with open(output_path, "a", encoding="utf-8", newline="") as out:
+        for chunk in reader:
+            rows = extract_events(chunk)
+            pd.DataFrame(rows, columns=OUTPUT_COLUMNS).to_csv(out, header=False, index=False)
+            out.flush()
+            os.fsync(out.fileno())
+            ckpt["rows_done"] += len(chunk)
+            ckpt["events"] += len(rows)
+            ckpt["output_bytes"] = os.path.getsize(output_path)
+            save_checkpoint(ckpt)
+            print(f"💾 {ckpt['rows_done']} rows processed, {ckpt['events']} events saved")
+
+    os.remove(CHECKPOINT_PATH)
+    return ckpt["events"]
+
+
+def main():
+    if NUM_WORKERS > 1:
+        from sharded_runner import run_sharded
+        run_sharded(DATA_PATH, OUTPUT_PATH, events_frame, NUM_WORKERS,
+                    init_fn=warm_up_worker, num_threads=THREADS_PER_WORKER)
+        events_df = pd.read_csv(OUTPUT_PATH)
+        n_events = len(events_df)
+    elif STREAMING:
+        n_events = extract_events_streaming(DATA_PATH, OUTPUT_PATH)
+        events_df = pd.read_csv(OUTPUT_PATH, nrows=10)
+    else:
+        # === Load dataset ===
+        df = pd.read_csv(DATA_PATH)
+
+        # --- Process dataset ---
+        extracted_rows = extract_events(df)
+
+        # --- Save results ---
+        events_df = pd.DataFrame(extracted_rows, columns=OUTPUT_COLUMNS)
+        events_df.to_csv(OUTPUT_PATH, index=False)
+        n_events = len(events_df)
+    print(f"✅ Extracted {n_events} financial events.")
+    print(f"💾 Saved to {OUTPUT_PATH}")
+    if NUM_WORKERS == 1 and EVENT_MODE == "zero-shot" and get_cache():
+        print(f"🗄️ Zero-shot cache: {get_cache().stats()}")
+
+    # --- Display sample output ---
+    print(events_df.head(10))
 
-# --- Save results ---
-events_df = pd.DataFrame(extracted_rows)
-events_df.to_csv(OUTPUT_PATH, index=False)
-print(f"✅ Extracted {len(events_df)} financial events.")
-print(f"💾 Saved to {OUTPUT_PATH}")
 
-# --- Display sample output ---
-print(events_df.head(10))
+if __name__ == "__main__":
+    main()
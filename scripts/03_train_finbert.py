@@ -1,108 +1,159 @@
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, confusion_matrix
-from datasets import Dataset
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, Trainer, TrainingArguments
-from imblearn.over_sampling import RandomOverSampler
-import torch
-from torch.nn import CrossEntropyLoss
-
-# 1. LOAD AND BALANCE DATA
-DATA_PATH = "data/processed/preprocessed_fiqa.csv"
-df = pd.read_csv(DATA_PATH)
-df = df.rename(columns={'clean_text': 'text'})
-
-label_map = {label: i for i, label in enumerate(df['label'].unique())}
-df['label_id'] = df['label'].map(label_map)
+from token_cache import load_tokenized
 
-# Balance classes
-ros = RandomOverSampler()
-X_bal, y_bal = ros.fit_resample(df[['text']], df['label_id'])
-df_bal = pd.DataFrame({'text': X_bal['text'], 'label_id': y_bal})
+DATA_PATH = "data/processed/preprocessed_fiqa.csv"
+BASE_MODEL = "yiyanghkust/finbert-tone"
+MAX_LENGTH = 128
+BATCH_SIZE = 16
+BALANCE_MODE = "weighted"  # "weighted": class-weighted sampler + on-the-fly augmentation | "oversample": RandomOverSampler + augmented copies
+AUG_PROB = 0.5             # chance a training example is augmented per draw ("weighted" mode)
+PROFILE_STEPS = None  # e.g. (50, 60) to capture a torch.profiler trace of those steps
 
 # Optional: Simple Text Augmentation
 def simple_synonym(text):
     synonyms = {'gain':'profit', 'loss':'decline'}
     return ' '.join([synonyms.get(w, w) for w in text.split()])
 
-df_bal['text_aug'] = df_bal['text'].apply(simple_synonym)
-df_aug = pd.concat([
-    df_bal[['text','label_id']],
-    pd.DataFrame({'text': df_bal['text_aug'], 'label_id': df_bal['label_id']})
-])
-
-# 2. SPLIT DATA
-train_df, test_df = train_test_split(df_aug, test_size=0.2, stratify=df_aug['label_id'], random_state=42)
-train_dataset = Dataset.from_pandas(train_df[['text','label_id']].rename(columns={'label_id':'labels'}))
-test_dataset = Dataset.from_pandas(test_df[['text','label_id']].rename(columns={'label_id':'labels'}))
-
-# 3. TOKENIZE
-tokenizer = AutoTokenizer.from_pretrained("yiyanghkust/finbert-tone")
-def tokenize(batch):
-    return tokenizer(batch['text'], padding='max_length', truncation=True, max_length=128)
-train_dataset = train_dataset.map(tokenize, batched=True)
-test_dataset = test_dataset.map(tokenize, batched=True)
-train_dataset.set_format('torch', columns=['input_ids', 'attention_mask', 'labels'])
-test_dataset.set_format('torch', columns=['input_ids', 'attention_mask', 'labels'])
-
-# 4. CLASS WEIGHTS
-label_counts = train_df['label_id'].value_counts()
-weights = torch.tensor([1.0/label_counts[i] for i in range(len(label_map))], dtype=torch.float32)
-q
-
-# 5. DEFINE CUSTOM TRAINER TO OVERRIDE LOSS
-from transformers import Trainer
-from torch.nn import CrossEntropyLoss
-
-class WeightedTrainer(Trainer):
-    def compute_loss(self, model, inputs, return_outputs=False, *args, **kwargs):
-        labels = inputs.get("labels")
-        outputs = model(**inputs)
-        loss_fct = CrossEntropyLoss(weight=weights.to(outputs.logits.device))
-        loss = loss_fct(outputs.logits, labels)
-        return (loss, outputs) if return_outputs else loss
-
-
-# 6. TRAINING ARGUMENTS
-training_args = TrainingArguments(
-    output_dir="models/finbert_improved",
-    learning_rate=3e-5,
-    per_device_train_batch_size=16,
-    num_train_epochs=7,
-    weight_decay=0.01,
-    save_total_limit=2,
-    logging_dir="./logs_improved",
-    logging_steps=25,
-)
-
-# 7. MODEL
-model = AutoModelForSequenceClassification.from_pretrained(
-    "yiyanghkust/finbert-tone",
-    num_labels=len(label_map)
-)
-
-# 8. TRAIN
-trainer = WeightedTrainer(
-    model=model,
-    args=training_args,
-    train_dataset=train_dataset,
-    eval_dataset=test_dataset,
-)
-trainer.train()
-trainer.save_model(training_args.output_dir)
-
-# 9. EVALUATE
-outputs = trainer.predict(test_dataset)
-y_true = test_dataset['labels']
-y_pred = outputs.predictions.argmax(axis=-1)
-
-print(classification_report(y_true, y_pred, target_names=list(label_map.keys())))
-print(confusion_matrix(y_true, y_pred))
-
-# 10. ERROR ANALYSIS
-rev_label_map = {v: k for k, v in label_map.items()}
-incorrect = []
-for text, gt, pred in zip(test_dataset['text'], y_true, y_pred):
-    if gt != pred:
-        incorrect.append((text, rev_label_map[int(gt)], rev_label_map[int(pred)]))
-pd.DataFrame(incorrect, columns=['text','true_label','pred_label']).to_csv('outputs/fiqa_errors_improved.csv', index=False)
+
+def main():
+    # sklearn, imblearn, torch, transformers and the trainer helpers are imported here, not at module load
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import classification_report, confusion_matrix
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification, TrainingArguments, DataCollatorWithPadding
+    from imblearn.over_sampling import RandomOverSampler
+    import torch
+    from torch.nn import CrossEntropyLoss
+    from training_utils import LengthGroupedTrainer, AugmentingCollator, report_padding
+    from training_profiler import ThroughputProfilerCallback
+
+    # 1. LOAD AND BALANCE DATA
+    df = pd.read_csv(DATA_PATH)
+    df = df.rename(columns={'clean_text': 'text'})
+
+    label_map = {label: i for i, label in enumerate(df['label'].unique())}
+    df['label_id'] = df['label'].map(label_map)
+
+    if BALANCE_MODE == "oversample":
+        # Balance classes
+        ros = RandomOverSampler()
+        X_bal, y_bal = ros.fit_resample(df[['text']], df['label_id'])
+        # 'row' points back into DATA_PATH (and so into the shared token cache)
+        df_bal = pd.DataFrame({'row': ros.sample_indices_, 'text': X_bal['text'], 'label_id': y_bal})
+
+        df_bal['text_aug'] = df_bal['text'].apply(simple_synonym)
+        df_aug = pd.concat([
+            df_bal[['row','text','label_id']].assign(augmented=False),
+            pd.DataFrame({'row': df_bal['row'], 'text': df_bal['text_aug'], 'label_id': df_bal['label_id'], 'augmented': True})
+        ])
+    else:
+        # Original rows only: the sampler balances classes, the collator augments
+        df_aug = pd.DataFrame({'row': df.index, 'text': df['text'], 'label_id': df['label_id'], 'augmented': False})
+
+    # 2. SPLIT DATA
+    train_df, test_df = train_test_split(df_aug, test_size=0.2, stratify=df_aug['label_id'], random_state=42)
+
+    # 3. TOKENIZE (no padding here: batches are padded dynamically by the collator)
+    # Rows are taken from the shared token cache; only augmented copies whose
+    # text actually changed are tokenized again.
+    tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL)
+    base_dataset = load_tokenized(DATA_PATH, BASE_MODEL, MAX_LENGTH)
+
+    def to_dataset(part):
+        ds = base_dataset.select(part['row'].tolist())
+        ds = ds.add_column('labels', part['label_id'].tolist())
+        if not part['augmented'].any():
+            return ds
+        ds = ds.add_column('aug_text', [t if aug else None for t, aug in zip(part['text'], part['augmented'])])
+        def apply_augmentation(batch):
+            for i, aug_text in enumerate(batch['aug_text']):
+                if aug_text is not None and aug_text != batch['text'][i]:
+                    enc = tokenizer(aug_text, truncation=True, max_length=MAX_LENGTH)
+                    for key, value in enc.items():
+                        batch[key][i] = value
+                    batch['length'][i] = len(enc['input_ids'])
+                    batch['text'][i] = aug_text
+            return batch
+        return ds.map(apply_augmentation, batched=True, remove_columns=['aug_text'])
+
+    train_dataset = to_dataset(train_df)
+    test_dataset = to_dataset(test_df)
+    print(f"🔹 Balance mode '{BALANCE_MODE}': {len(train_dataset)} train / {len(test_dataset)} test rows")
+    # The text column is only needed by the augmenting collator
+    test_dataset = test_dataset.remove_columns(['text', 'length'])
+    if BALANCE_MODE == "oversample":
+        data_collator = DataCollatorWithPadding(tokenizer)
+    else:
+        data_collator = AugmentingCollator(tokenizer, simple_synonym, p=AUG_PROB, max_length=MAX_LENGTH)
+    padding_stats = report_padding(train_dataset['length'], BATCH_SIZE, MAX_LENGTH)
+
+    # 4. CLASS WEIGHTS
+    label_counts = train_df['label_id'].value_counts()
+    if BALANCE_MODE == "oversample":
+        weights = torch.tensor([1.0/label_counts[i] for i in range(len(label_map))], dtype=torch.float32)
+        sample_weights = None
+    else:
+        # Classes are balanced by sampling, so the loss stays unweighted
+        weights = None
+        sample_weights = (1.0 / train_df['label_id'].map(label_counts)).tolist()
+
+    # 5. DEFINE CUSTOM TRAINER TO OVERRIDE LOSS
+    class WeightedTrainer(LengthGroupedTrainer):
+        def compute_loss(self, model, inputs, return_outputs=False, *args, **kwargs):
+            labels = inputs.get("labels")
+            outputs = model(**inputs)
+            loss_fct = CrossEntropyLoss(weight=weights.to(outputs.logits.device) if weights is not None else None)
+            loss = loss_fct(outputs.logits, labels)
+            return (loss, outputs) if return_outputs else loss
+
+
+    # 6. TRAINING ARGUMENTS
+    training_args = TrainingArguments(
+        output_dir="models/finbert_improved",
+        learning_rate=3e-5,
+        per_device_train_batch_size=BATCH_SIZE,
+        num_train_epochs=7,
+        weight_decay=0.01,
+        save_total_limit=2,
+        logging_dir="./logs_improved",
+        logging_steps=25,
+        remove_unused_columns=BALANCE_MODE == "oversample",
+    )
+
+    # 7. MODEL
+    model = AutoModelForSequenceClassification.from_pretrained(
+        BASE_MODEL,
+        num_labels=len(label_map)
+    )
+
+    # 8. TRAIN
+    trainer = WeightedTrainer(
+        model=model,
+        args=training_args,
+        train_dataset=train_dataset,
+        eval_dataset=test_dataset,
+        data_collator=data_collator,
+        sample_weights=sample_weights,
+        callbacks=[ThroughputProfilerCallback(profile_steps=PROFILE_STEPS)],
+    )
+    trainer.train()
+    trainer.save_model(training_args.output_dir)
+
+    # 9. EVALUATE
+    outputs = trainer.predict(test_dataset)
+    y_true = test_dataset['labels']
+    y_pred = outputs.predictions.argmax(axis=-1)
+
+    print(classification_report(y_true, y_pred, target_names=list(label_map.keys())))
+    print(confusion_matrix(y_true, y_pred))
+
+    # 10. ERROR ANALYSIS
+    rev_label_map = {v: k for k, v in label_map.items()}
+    incorrect = []
+    for text, gt, pred in zip(test_df['text'], y_true, y_pred):
+        if gt != pred:
+            incorrect.append((text, rev_label_map[int(gt)], rev_label_map[int(pred)]))
+    pd.DataFrame(incorrect, columns=['text','true_label','pred_label']).to_csv('outputs/fiqa_errors_improved.csv', index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,99 @@
 import pandas as pd
-from textattack.augmentation import EasyDataAugmenter
 from tqdm import tqdm
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import random
+import time
 import os
 
 DATA_PATH = r"A:\Infosys\data\processed\preprocessed_fiqa.csv"
 OUTPUT_PATH = r"A:\Infosys\data\augmented\augmented_fiqa.csv"
+NUM_WORKERS = os.cpu_count() or 1   # 1 = augment in this process
+CHUNK_SIZE = 200                    # rows per task; also the unit of seeding and writing
+SEED = 42                           # chunk i is augmented with seed SEED + i, so output is reproducible
 
-os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+# --- per-process augmenter (built once per worker) ---
+_augmenter = None
 
-df = pd.read_csv(DATA_PATH)
-augmenter = EasyDataAugmenter()
 
-augmented_rows = []
+def init_augment_worker():
+    global _augmenter
+    from textattack.augmentation import EasyDataAugmenter   # deferred: textattack loads torch and NLTK data
+    _augmenter = EasyDataAugmenter()
 
-print("🔹 Augmenting data (this may take a few minutes)...")
-for _, row in tqdm(df.iterrows(), total=len(df)):
-    text, label = row['text'], row['label']
-    try:
-        aug_texts = augmenter.augment(text)
-        for t in aug_texts:
-            augmented_rows.append((t, label))
-    except Exception:
-        pass
 
-aug_df = pd.DataFrame(augmented_rows, columns=["text", "label"])
-final_df = pd.concat([df, aug_df], ignore_index=True)
-final_df.to_csv(OUTPUT_PATH, index=False)
+def augment_chunk(chunk_idx, rows):
+    """
+    Augmented (text, label, source_idx) rows for one chunk of (source_idx,
+    text, label) rows, plus failure counts by exception type.
+    """
+    random.seed(SEED + chunk_idx)
+    np.random.seed(SEED + chunk_idx)
+    augmented, failures = [], Counter()
+    for source_idx, text, label in rows:
+        try:
+            for t in _augmenter.augment(text):
+                augmented.append((t, label, source_idx))
+        except Exception as e:
+            failures[type(e).__name__] += 1
+    return chunk_idx, augmented, failures
 
-print(f"✅ Augmented dataset saved at: {OUTPUT_PATH}")
-print(f"Total samples: {len(final_df)}")
+
+def augment_chunks(chunks):
+    """Yields chunk results in chunk order, computed serially or in a process pool."""
+    if NUM_WORKERS <= 1:
+        init_augment_worker()
+        for i, rows in enumerate(chunks):
+            yield augment_chunk(i, rows)
+        return
+    with ProcessPoolExecutor(max_workers=NUM_WORKERS, initializer=init_augment_worker) as pool:
+        # keep a bounded window of chunks in flight so memory stays flat
+        window = NUM_WORKERS * 2
+        futures = {}
+        for i in range(min(window, len(chunks))):
+            futures[i] = pool.submit(augment_chunk, i, chunks[i])
+        for i in range(len(chunks)):
+            result = futures.pop(i).result()
+            if i + window < len(chunks):
+                futures[i + window] = pool.submit(augment_chunk, i + window, chunks[i + window])
+            yield result
+
+
+def main():
+    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+    df = pd.read_csv(DATA_PATH)
+    # source_idx: the row of DATA_PATH every output row comes from (its own row for originals),
+    # so consumers can keep the augmentations of held-out rows out of training
+    df['source_idx'] = df.index
+    rows = list(zip(df['source_idx'], df['text'].astype(str), df['label']))
+    chunks = [rows[i:i + CHUNK_SIZE] for i in range(0, len(rows), CHUNK_SIZE)]
+
+    # originals first, then augmented rows streamed chunk by chunk in input order
+    tmp_path = OUTPUT_PATH + ".tmp"
+    df[['text', 'label', 'source_idx']].to_csv(tmp_path, index=False)
+    total, failures = len(df), Counter()
+
+    print(f"🔹 Augmenting {len(rows)} rows in {len(chunks)} chunks with {NUM_WORKERS} worker(s)...")
+    t0 = time.perf_counter()
+    with open(tmp_path, "a", encoding="utf-8", newline="") as f:
+        with tqdm(total=len(rows)) as progress:
+            for chunk_idx, augmented, chunk_failures in augment_chunks(chunks):
+                pd.DataFrame(augmented, columns=['text', 'label', 'source_idx']).to_csv(f, header=False, index=False)
+                f.flush()
+                total += len(augmented)
+                failures.update(chunk_failures)
+                progress.update(len(chunks[chunk_idx]))
+    os.replace(tmp_path, OUTPUT_PATH)
+    elapsed = time.perf_counter() - t0
+
+    print(f"✅ Augmented dataset saved at: {OUTPUT_PATH}")
+    print(f"Total samples: {total}")
+    print(f"🔹 {len(rows) / max(elapsed, 1e-9):.1f} rows/sec ({elapsed:.1f}s)")
+    if failures:
+        print(f"❌ {sum(failures.values())} rows failed to augment: " +
+              ", ".join(f"{name} x{n}" for name, n in failures.most_common()))
+
+
+if __name__ == "__main__":
+    main()
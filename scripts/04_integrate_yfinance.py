@@ -1,13 +1,28 @@
 # a:\Infosys\scripts\04_integrate_yfinance.py
 import pandas as pd
-import yfinance as yf
 import re
-from tqdm import tqdm
 import datetime as dt
+import os
+from quote_cache import QuoteCache, make_provider, change_percent
+from quote_fetcher import ConcurrentFetcher
+from entity_linker import EntityLinker
+from price_store import PriceStore, EVENT_WINDOWS
 
 # === CONFIG ===
 INPUT_PATH = r"A:\Infosys\outputs\financial_events_extracted.csv"
 OUTPUT_PATH = r"A:\Infosys\outputs\financial_events_verified.csv"
+COMPANY_LISTING_PATH = r"A:\Infosys\data\reference\company_listing.csv"  # ticker,name,aliases ('|'-separated); falls back to company_ticker_map
+QUOTE_PROVIDER = "yfinance"                                      # "yfinance" | "fixture" (offline) | "http" | "price_store" (offline)
+QUOTE_FIXTURE_PATH = r"A:\Infosys\data\fixtures\quotes.csv"     # used when QUOTE_PROVIDER = "fixture"
+QUOTE_HTTP_URL = "http://localhost:8000/quotes"                  # used when QUOTE_PROVIDER = "http"
+QUOTE_CACHE_PATH = r"A:\Infosys\outputs\cache\quotes.json"
+QUOTE_TTL_SECONDS = 15 * 60
+QUOTE_WORKERS = 16          # concurrent quote requests
+QUOTE_RATE_PER_SEC = 10     # provider calls per second (None = unlimited)
+QUOTE_TIMEOUT = 10.0        # seconds per call (also the HTTP request timeout)
+QUOTE_RETRIES = 3
+PRICE_STORE_DIR = r"A:\Infosys\data\prices"   # local daily prices (price_store.py)
+EVENT_DATE_COLUMN = "date"                     # optional; adds returns over EVENT_WINDOWS around each event
 
 # === Load extracted events ===
 df = pd.read_csv(INPUT_PATH)
@@ -30,56 +45,51 @@ company_ticker_map = {
     "netflix": "NFLX"
 }
 
-# --- Function to detect which company a sentence refers to ---
-def detect_company(text):
-    text_lower = text.lower()
-    for name in company_ticker_map.keys():
-        if name in text_lower:
-            return name
-    return None
+# --- Link every company a sentence mentions (one row per event and company) ---
+if os.path.exists(COMPANY_LISTING_PATH):
+    linker = EntityLinker.from_csv(COMPANY_LISTING_PATH)
+else:
+    print(f"[WARN] {COMPANY_LISTING_PATH} not found, linking with the built-in company_ticker_map")
+    linker = EntityLinker.from_mapping(company_ticker_map)
+print(f"🔹 Entity linker: {len(linker.aliases)} aliases for {len(set(linker.aliases.values()))} tickers")
 
-df["company"] = df["text"].apply(detect_company)
-df = df.dropna(subset=["company"])
-print(f"✅ {len(df)} events linked to known companies")
+df["ticker"] = linker.link_series(df["text"])
+df = df.explode("ticker").dropna(subset=["ticker"])
+df["company"] = df["ticker"].map(linker.names)
+print(f"✅ {len(df)} event-company links ({df.index.nunique()} events linked to known companies)")
 
-# --- Fetch stock data from Yahoo Finance ---
-def fetch_stock_data(ticker):
-    try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        current_price = info.get("currentPrice") or info.get("regularMarketPrice")
-        prev_close = info.get("previousClose")
-        market_cap = info.get("marketCap")
-        return current_price, prev_close, market_cap
-    except Exception as e:
-        return None, None, None
+# --- Fetch stock data once per distinct ticker (cached with a TTL) ---
+fetcher = ConcurrentFetcher(QUOTE_WORKERS, QUOTE_RATE_PER_SEC, QUOTE_TIMEOUT, QUOTE_RETRIES)
+quote_cache = QuoteCache(make_provider(QUOTE_PROVIDER, QUOTE_FIXTURE_PATH, QUOTE_HTTP_URL, PRICE_STORE_DIR, QUOTE_TIMEOUT),
+                         QUOTE_CACHE_PATH, QUOTE_TTL_SECONDS, fetcher=fetcher)
+quotes = quote_cache.get_many(df["ticker"])
+print(f"🔹 Quotes for {len(quotes)} tickers ({len(df)} events): {quote_cache.stats()}")
+print(f"🔹 Fetch stats: {fetcher.summary()}")
 
 # Add financial metrics
-df["ticker"] = df["company"].map(company_ticker_map)
-
 data_rows = []
-for _, row in tqdm(df.iterrows(), total=len(df), desc="Fetching financial data"):
-    ticker = row["ticker"]
-    current, prev, cap = fetch_stock_data(ticker)
-    change = None
-    if current and prev:
-        try:
-            change = round(((current - prev) / prev) * 100, 2)
-        except ZeroDivisionError:
-            change = None
+for row in df.itertuples(index=False):
+    quote = quotes[row.ticker]
     data_rows.append({
-        "text": row["text"],
-        "detected_event": row["detected_event"],
-        "sentiment": row["sentiment"],
-        "company": row["company"].title(),
-        "ticker": ticker,
-        "current_price": current,
-        "previous_close": prev,
-        "change_percent": change,
-        "market_cap": cap
+        "text": row.text,
+        "detected_event": row.detected_event,
+        "sentiment": row.sentiment,
+        "company": row.company,
+        "ticker": row.ticker,
+        "current_price": quote["current_price"],
+        "previous_close": quote["previous_close"],
+        "change_percent": change_percent(quote),
+        "market_cap": quote["market_cap"]
     })
 
 final_df = pd.DataFrame(data_rows)
+
+# --- Market reaction around the event date, from the local price store ---
+if EVENT_DATE_COLUMN in df.columns and os.path.isdir(PRICE_STORE_DIR):
+    returns = PriceStore(PRICE_STORE_DIR).event_window_returns(df["ticker"], df[EVENT_DATE_COLUMN], EVENT_WINDOWS)
+    final_df.insert(1, "event_date", df[EVENT_DATE_COLUMN].to_numpy())
+    final_df = pd.concat([final_df, returns], axis=1)
+    print(f"🔹 Event-window returns for {int(returns.drop(columns='event_trading_date').notna().any(axis=1).sum())}/{len(final_df)} events")
 final_df.to_csv(OUTPUT_PATH, index=False)
 print(f"💾 Verified events saved to: {OUTPUT_PATH}")
 
@@ -1,53 +1,85 @@
+import os
 import pandas as pd
-from datasets import Dataset
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, Trainer
-from sklearn.metrics import classification_report, confusion_matrix
+from inference_backends import load_model, predict_proba_tokenized
+from token_cache import load_tokenized
 
 # Set your paths (update if needed)
 DATA_PATH = r"A:\Infosys\data\processed\preprocessed_fiqa.csv"
 MODEL_DIR = r"A:\Infosys\models\finbert_finetuned"
 BASE_MODEL = "yiyanghkust/finbert-tone"
+MAX_LENGTH = 128
+BACKEND = os.environ.get("FINBERT_BACKEND", "pytorch")  # pytorch | quantized | onnx | onnx-int8
+NUM_WORKERS = 1             # >1 scores the test split in a sharded process pool
+THREADS_PER_WORKER = None   # None = cpu_count // NUM_WORKERS
+SCORES_PATH = r"A:\Infosys\outputs\eda\fiqa_test_scores.csv"
 
-# Load the labeled data
-df = pd.read_csv(DATA_PATH)
-label_map = {label: i for i, label in enumerate(df['label'].unique())}
-rev_label_map = {v: k for k, v in label_map.items()}
-df['label_id'] = df['label'].map(label_map)
-
-# Create test split (last 20%)
-test_size = int(0.2 * len(df))
-test_df = df.tail(test_size).copy()  # copy for safe access
-
-# Make huggingface Dataset
-test_dataset = Dataset.from_pandas(test_df[['text','label_id']].rename(columns={'label_id':'labels'}))
-
-# Load tokenizer and model
-tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL)
-def tokenize(batch):
-    return tokenizer(batch['text'], padding='max_length', truncation=True, max_length=128)
-test_dataset = test_dataset.map(tokenize, batched=True)
-test_dataset.set_format('torch', columns=['input_ids', 'attention_mask', 'labels'])
-
-# Load your finetuned model
-model = AutoModelForSequenceClassification.from_pretrained(MODEL_DIR)
-trainer = Trainer(model=model)
-
-# Predict
-preds = trainer.predict(test_dataset)
-y_true = test_df['label_id'].to_list()
-y_pred = preds.predictions.argmax(axis=-1)
-
-# Metrics
-print("\n--- Classification Report ---")
-print(classification_report(y_true, y_pred, target_names=list(label_map.keys())))
-print("--- Confusion Matrix ---")
-print(confusion_matrix(y_true, y_pred))
-
-# Error analysis (using test_df['text'] for error-free reporting)
-incorrect = []
-for text, gt, pred in zip(test_df['text'], y_true, y_pred):
-    if gt != pred:
-        incorrect.append((text, rev_label_map[gt], rev_label_map[pred]))
-error_path = r"A:\Infosys\outputs\eda\fiqa_errors.csv"
-pd.DataFrame(incorrect, columns=['text', 'true_label', 'pred_label']).to_csv(error_path, index=False)
-print(f"❌ Misclassified samples saved to: {error_path}")
+# --- per-worker model for sharded scoring ---
+_tokenizer = None
+_model = None
+_dataset = None
+
+
+def init_scoring_worker():
+    global _tokenizer, _model, _dataset
+    from transformers import AutoTokenizer   # deferred, like torch inside inference_backends
+    _tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL)
+    _model = load_model(MODEL_DIR, backend=BACKEND)
+    # token ids from the shared cache; memory-mapped, so workers share its pages
+    _dataset = load_tokenized(DATA_PATH, BASE_MODEL, MAX_LENGTH)
+
+
+def score_frame(df):
+    """
+    Predicted label id and class probabilities for every row of a shard.
+    df.index holds the rows' positions in DATA_PATH, which select their
+    cached token ids.
+    """
+    probs = predict_proba_tokenized(_model, _tokenizer, _dataset.select(df.index.tolist()))
+    out = pd.DataFrame(probs, columns=[f"prob_{i}" for i in range(probs.shape[1])])
+    out.insert(0, "pred_id", probs.argmax(axis=-1))
+    return out
+
+
+def main():
+    from sklearn.metrics import classification_report, confusion_matrix
+    # Load the labeled data
+    df = pd.read_csv(DATA_PATH)
+    label_map = {label: i for i, label in enumerate(df['label'].unique())}
+    rev_label_map = {v: k for k, v in label_map.items()}
+    df['label_id'] = df['label'].map(label_map)
+
+    # Create test split (last 20%)
+    test_size = int(0.2 * len(df))
+    test_df = df.tail(test_size).copy()  # copy for safe access
+
+    # Load tokenizer and model, predict
+    y_true = test_df['label_id'].to_list()
+    load_tokenized(DATA_PATH, BASE_MODEL, MAX_LENGTH)   # tokenizes on the first run only, before any worker reads it
+    if NUM_WORKERS > 1:
+        from sharded_runner import run_sharded
+        run_sharded(DATA_PATH, SCORES_PATH, score_frame, NUM_WORKERS, init_fn=init_scoring_worker,
+                    num_threads=THREADS_PER_WORKER, start_row=len(df) - test_size)
+        y_pred = pd.read_csv(SCORES_PATH)['pred_id'].to_numpy()
+    else:
+        print(f"🔹 Predicting with the {BACKEND} backend")
+        init_scoring_worker()
+        y_pred = score_frame(test_df)['pred_id'].to_numpy()
+
+    # Metrics
+    print("\n--- Classification Report ---")
+    print(classification_report(y_true, y_pred, target_names=list(label_map.keys())))
+    print("--- Confusion Matrix ---")
+    print(confusion_matrix(y_true, y_pred))
+
+    # Error analysis (using test_df['text'] for error-free reporting)
+    incorrect = []
+    for text, gt, pred in zip(test_df['text'], y_true, y_pred):
+        if gt != pred:
+            incorrect.append((text, rev_label_map[gt], rev_label_map[pred]))
+    error_path = r"A:\Infosys\outputs\eda\fiqa_errors.csv"
+    pd.DataFrame(incorrect, columns=['text', 'true_label', 'pred_label']).to_csv(error_path, index=False)
+    print(f"❌ Misclassified samples saved to: {error_path}")
+
+
+if __name__ == "__main__":
+    main()
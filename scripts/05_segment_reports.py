@@ -1,12 +1,15 @@
 # a:\Infosys\scripts\05_segment_reports.py
 import os, re, json
-import fitz  # PyMuPDF
+from bisect import bisect_right
 from collections import defaultdict
+from pdf_pages import read_pages, page_offsets
+from rule_matcher import RuleMatcher
+from segment_store import SegmentStore
 
 # === CONFIG ===
 INPUT_PDF = r"A:\Infosys\sample_reports\10K_sample.pdf"   # change as needed
-OUT_DIR = r"A:\Infosys\outputs\doc_segments"
-os.makedirs(OUT_DIR, exist_ok=True)
+OUT_DIR = r"A:\Infosys\outputs\doc_segments"   # segment store (segments.bin + segments_index.csv) and *_sections.json
+NUM_WORKERS = os.cpu_count() or 1   # processes reading page ranges in parallel (1 = sequential)
 
 # --- Canonical SEC/Annual Report sections (regex, case-insensitive) ---
 SECTION_PATTERNS = [
@@ -21,13 +24,39 @@ SECTION_PATTERNS = [
     (r"\bItem\s+9\.\s*Changes\b", "Controls & Procedures"),
 ]
 
+# --- Heading text (lowercased) → section label; the first matching rule wins ---
+HEADING_PATTERNS = [
+    (r"risk\s+factors", "Risk Factors"),
+    (r"management.?s.*discussion.*analysis", "MD&A"),
+    (r"financial\s+statements", "Financial Statements"),
+    (r"\bitem\s+7a\b", "MD&A Supplement"),
+    (r"\bitem\s+7\b", "MD&A"),
+    (r"\bitem\s+8\b", "Financial Statements"),
+    (r"\bitem\s+1\b", "Business"),
+]
+
+# Each set compiled once into a single-pass matcher
+SECTION_RULES = RuleMatcher(SECTION_PATTERNS, flags=re.I)
+HEADING_RULES = RuleMatcher(HEADING_PATTERNS, flags=0)   # applied to lowercased text
+
+def heading_label(txt):
+    # first rule in HEADING_PATTERNS order with a hit, as the old if/elif chain
+    return HEADING_RULES.first(txt.lower())
+
 def find_candidates(text):
-    hits = []
-    for pat, label in SECTION_PATTERNS:
-        for m in re.finditer(pat, text, flags=re.I):
-            hits.append((m.start(), label))
-    hits.sort(key=lambda x: x[0])
-    return hits
+    """[(start, end, label)] for every section anchor in `text`, in text order (one scan)."""
+    return [(start, end, label) for label, start, end in SECTION_RULES.finditer(text)]
+
+def page_of(offsets, char_idx):
+    # last page starting at or before char_idx, by binary search over page_offsets()
+    # (empty pages share an offset with the next page; the last of them wins, as before)
+    return max(bisect_right(offsets, char_idx) - 1, 0)
+
+def find_anchors(pages):
+    """[(page, start, end, label)] for every anchor, with character spans in the joined text."""
+    offsets = page_offsets(pages)
+    joined = "".join(p.text for p in pages)
+    return [(page_of(offsets, start), start, end, label) for start, end, label in find_candidates(joined)]
 
 def union_by_pages(spans):
     # Merge overlapping or consecutive page spans
@@ -41,81 +70,41 @@ def union_by_pages(spans):
             merged.append(s)
     return merged
 
-def extract_pdf_sections(pdf_path):
-    doc = fitz.open(pdf_path)
+def extract_pdf_sections(pdf_path, num_workers=NUM_WORKERS):
+    # every page is read once (text + font sizes); all passes below use `pages`
+    pages = read_pages(pdf_path, num_workers)
+    return segment_pages(pages), pages
+
+def segment_pages(pages):
     # 1) Heading detection by font size (collect big titles)
     heading_candidates = []
-    for i, page in enumerate(doc):
-        blocks = page.get_text("dict")["blocks"]
-        for b in blocks:
-            if "lines" not in b: 
-                continue
-            # measure average font size
-            sizes = []
-            text_buf = []
-            for l in b["lines"]:
-                for s in l["spans"]:
-                    sizes.append(s["size"])
-                    text_buf.append(s["text"])
-            if not sizes: 
-                continue
-            avg_size = sum(sizes)/len(sizes)
-            text = " ".join(text_buf).strip()
+    for page in pages:
+        for avg_size, text in page.blocks:
             # heuristic: very short & larger font → heading candidate
             if len(text) > 0 and len(text) < 180 and avg_size >= 10.5:
-                heading_candidates.append((i, avg_size, text))
+                heading_candidates.append((page.index, avg_size, text))
 
     # 2) Regex anchors by whole-document text (coarse)
-    full_text = []
-    page_offsets = []
-    acc = 0
-    for i, page in enumerate(doc):
-        t = page.get_text()
-        full_text.append(t)
-        page_offsets.append(acc)
-        acc += len(t)
-    joined = "".join(full_text)
-
-    regex_hits = []
-    for pat, label in SECTION_PATTERNS:
-        for m in re.finditer(pat, joined, flags=re.I):
-            # map char offset to page index approx
-            # (binary search would be better; linear ok for typical sizes)
-            char_idx = m.start()
-            page_idx = 0
-            for j in range(len(page_offsets)-1, -1, -1):
-                if char_idx >= page_offsets[j]:
-                    page_idx = j
-                    break
-            regex_hits.append((page_idx, label))
-    regex_hits.sort()
+    regex_hits = sorted((pg, label) for pg, _, _, label in find_anchors(pages))
 
     # 3) Combine signals → segment boundaries
     # Convert heading candidates that match common section titles into labels
     normalized_headings = []
     for (pg, size, txt) in heading_candidates:
-        norm = txt.lower()
-        label = None
-        if re.search(r"risk\s+factors", norm): label = "Risk Factors"
-        elif re.search(r"management.?s.*discussion.*analysis", norm): label = "MD&A"
-        elif re.search(r"financial\s+statements", norm): label = "Financial Statements"
-        elif re.search(r"\bitem\s+7a\b", norm): label = "MD&A Supplement"
-        elif re.search(r"\bitem\s+7\b", norm): label = "MD&A"
-        elif re.search(r"\bitem\s+8\b", norm): label = "Financial Statements"
-        elif re.search(r"\bitem\s+1\b", norm): label = "Business"
+        label = heading_label(txt)
         if label:
             normalized_headings.append((pg, label))
 
     candidates = sorted(set(regex_hits + normalized_headings))
     # If nothing found, fall back to whole doc "Body"
     if not candidates:
-        return {"Body":[(0, len(doc)-1)]}, doc
+        return {"Body":[(0, len(pages)-1)]}
 
     # Build ranges by next anchor - 1
     ranges = defaultdict(list)
     for idx, (pg, label) in enumerate(candidates):
         start = pg
-        end = candidates[idx+1][0]-1 if idx+1 < len(candidates) else len(doc)-1
+        end = candidates[idx+1][0]-1 if idx+1 < len(candidates) else len(pages)-1
         if start <= end:
             ranges[label].append((start, end))
 
@@ -123,29 +112,33 @@ def extract_pdf_sections(pdf_path):
     for k, spans in list(ranges.items()):
         ranges[k] = union_by_pages(spans)
 
-    return ranges, doc
-
-def save_segments(pdf_path, out_dir):
-    ranges, doc = extract_pdf_sections(pdf_path)
-    meta = {"pdf": pdf_path, "sections": {}}
-    for label, spans in ranges.items():
-        meta["sections"][label] = []
-        for (s, e) in spans:
-            # save text
-            buf = []
-            for p in range(s, e+1):
-                buf.append(doc[p].get_text())
-            txt = "\n".join(buf)
-            section_dir = os.path.join(out_dir, label.replace(" ", "_"))
-            os.makedirs(section_dir, exist_ok=True)
-            out_txt = os.path.join(section_dir, f"{os.path.basename(pdf_path)}_{s}-{e}.txt")
-            with open(out_txt, "w", encoding="utf-8") as f:
-                f.write(txt)
-            meta["sections"][label].append({"start_page": s, "end_page": e, "text_path": out_txt})
-    json_path = os.path.join(out_dir, f"{os.path.splitext(os.path.basename(pdf_path))[0]}_sections.json")
+    return ranges
+
+def section_texts(pdf_path, num_workers=NUM_WORKERS):
+    """[(label, start_page, end_page, text)] for every section span."""
+    ranges, pages = extract_pdf_sections(pdf_path, num_workers)
+    return [(label, s, e, "\n".join(pages[p].text for p in range(s, e+1)))
+            for label, spans in ranges.items() for (s, e) in spans]
+
+def write_segments(store, doc, pdf_path, sections, out_dir):
+    # texts go to the segment store; <doc>_sections.json keeps a small summary
+    meta = {"pdf": pdf_path, "doc": doc, "sections": {}}
+    for entry in store.append(doc, sections):
+        meta["sections"].setdefault(entry.label, []).append(
+            {"start_page": entry.start_page, "end_page": entry.end_page, "offset": entry.offset, "length": entry.length})
+    json_path = os.path.join(out_dir, f"{doc}_sections.json")
     with open(json_path, "w", encoding="utf-8") as f:
         json.dump(meta, f, indent=2)
-    print(f"✅ Segmentation saved:\n- JSON: {json_path}\n- Text per section under: {out_dir}")
+    return meta, json_path
+
+def save_segments(pdf_path, out_dir, num_workers=NUM_WORKERS, doc=None):
+    doc = doc or os.path.splitext(os.path.basename(pdf_path))[0]
+    sections = section_texts(pdf_path, num_workers)
+    with SegmentStore(out_dir) as store:
+        meta, json_path = write_segments(store, doc, pdf_path, sections, out_dir)
+    print(f"✅ Segmentation saved:\n- JSON: {json_path}\n- Section texts in the segment store: {out_dir}")
+    return meta
 
 if __name__ == "__main__":
+    os.makedirs(OUT_DIR, exist_ok=True)
     save_segments(INPUT_PDF, OUT_DIR)
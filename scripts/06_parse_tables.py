@@ -3,11 +3,13 @@ import os
 import pdfplumber
 import pandas as pd
 import re
+from sharded_runner import split_range, map_ranges
 
 # === CONFIG ===
 INPUT_PDF = r"A:\Infosys\sample_reports\10K_sample.pdf"
 OUTPUT_DIR = r"A:\Infosys\outputs\tables"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+NUM_WORKERS = os.cpu_count() or 1   # processes parsing page ranges in parallel (1 = sequential)
+MIN_PAGES_PER_RANGE = 8             # smaller documents are parsed in this process
 
 def clean_num(x):
     """Convert accounting-style numbers to floats."""
@@ -43,13 +45,23 @@ def classify_table(text):
         return "Cash Flow Statement"
     return "Other"
 
-def extract_tables(pdf_path):
+def extract_page_range(pdf_path, output_dir, start, stop):
+    """
+    Saves the tables of pages [start, stop) as CSVs, with a pdfplumber
+    handle of its own (so ranges can run in separate processes).
+    Returns the index rows [page, table_no, type, csv_path] in page order.
+    """
     index = []
 
     with pdfplumber.open(pdf_path) as pdf:
-        for p_no, page in enumerate(pdf.pages):
+        for p_no in range(start, stop):
+            page = pdf.pages[p_no]
             text = page.extract_text() or ""
             tables = page.extract_tables()
+            # drop pdfplumber's per-page object cache (Page.close() is recent; older releases have flush_cache())
+            release_page = getattr(page, "close", None) or getattr(page, "flush_cache", None)
+            if release_page is not None:
+                release_page()
 
             if not tables:
                 continue
@@ -68,18 +80,28 @@ def extract_tables(pdf_path):
                     df[col] = df[col].apply(clean_num).fillna(df[col])
 
                 out_csv = os.path.join(
-                    OUTPUT_DIR,
+                    output_dir,
                     f"table_p{p_no}_t{t_no}_{label.replace(' ', '_')}.csv"
                 )
 
                 df.to_csv(out_csv, index=False)
                 index.append([p_no, t_no, label, out_csv])
+    return index
 
-                print(f"✅ Saved table: {out_csv}")
+def extract_tables(pdf_path, output_dir=OUTPUT_DIR, num_workers=NUM_WORKERS):
+    os.makedirs(output_dir, exist_ok=True)
+    with pdfplumber.open(pdf_path) as pdf:
+        n_pages = len(pdf.pages)
+    ranges = split_range(n_pages, num_workers, min_size=MIN_PAGES_PER_RANGE)
+    index = [row for rows in map_ranges(extract_page_range, ranges, num_workers, pdf_path, output_dir)
+             for row in rows]
+    for row in index:
+        print(f"✅ Saved table: {row[3]}")
 
     index_df = pd.DataFrame(index, columns=["page", "table_no", "type", "csv_path"])
-    index_df.to_csv(os.path.join(OUTPUT_DIR, "tables_index.csv"), index=False)
-    print("\n📌 All tables indexed at:", os.path.join(OUTPUT_DIR, "tables_index.csv"))
+    index_df.to_csv(os.path.join(output_dir, "tables_index.csv"), index=False)
+    print("\n📌 All tables indexed at:", os.path.join(output_dir, "tables_index.csv"))
+    return index_df
 
 if __name__ == "__main__":
     extract_tables(INPUT_PDF)
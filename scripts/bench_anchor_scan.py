@@ -0,0 +1,192 @@
+# a:\Infosys\scripts\bench_anchor_scan.py
+"""
+Anchor scan of 05_segment_reports.py on very long documents: the old
+per-pattern scan vs one combined regex with a binary-search page index.
+
+The old code ran re.finditer once per SECTION_PATTERNS entry over the
+joined text. It mapped every hit to its page by walking the page offsets
+backwards, so the cost grew with pages x anchors. Heading labels came from
+an if/elif chain of re.search calls. That version is kept below as
+legacy_anchors() / legacy_heading_label(). The current code makes one scan
+with the combined SECTION_RULES pattern, finds pages with bisect
+(find_anchors) and labels headings with HEADING_RULES.first, the same
+combined matcher over HEADING_PATTERNS.
+
+No PDF is involved. Synthetic PageText documents of DOC_PAGES pages are
+built with about ANCHORS_PER_PAGE anchor phrases per page, including
+empty pages. Both versions must give the same (page, label) anchors and
+the same heading labels.
+"""
+import os
+import re
+import json
+import time
+import random
+import importlib
+from pdf_pages import PageText, page_offsets
+
+seg = importlib.import_module("05_segment_reports")
+
+# === CONFIG ===
+DOC_PAGES = (1000, 5000)
+ANCHORS_PER_PAGE = 2
+EMPTY_PAGE_RATE = 0.05
+REPEATS = 3
+SEED = 42
+OUTPUT_PATH = r"A:\Infosys\outputs\benchmarks\anchor_scan.json"
+
+ANCHOR_PHRASES = [
+    "Item 1. Business",
+    "Item 1A. Risk Factors",
+    "see Risk Factors above",
+    "Item 7. Management's Discussion and Analysis of Financial Condition",
+    "Management’s Discussion and Analysis",
+    "Item 7A. Quantitative and Qualitative Disclosures About Market Risk",
+    "Item 8. Financial Statements and Supplementary Data",
+    "Notes to Consolidated Financial Statements",
+    "Item 9. Changes in and Disagreements With Accountants",
+]
+HEADINGS = [
+    "ITEM 1. BUSINESS", "Item 1A. Risk Factors", "Item 7A. Quantitative and Qualitative Disclosures",
+    "ITEM 7. MANAGEMENT'S DISCUSSION AND ANALYSIS", "Item 8. Financial Statements", "Item 9B. Other Information",
+    "Liquidity and Capital Resources", "Item 10. Directors", "Item 1B. Unresolved Staff Comments",
+    "Item 7A and Item 7 (continued)", "Item 8 and Item 7",   # several rules hit: rule order decides
+]
+BODY_SENTENCES = [
+    "Net revenue increased 8% compared to the prior fiscal year, driven by higher services volume.",
+    "Operating expenses were $4.2 billion, reflecting continued investment in research and development.",
+    "We are exposed to foreign currency exchange rate fluctuations in our international operations.",
+    "Gross margin decreased due to higher component costs and an unfavorable product mix.",
+    "Cash, cash equivalents and marketable securities totaled $48.3 billion at year end.",
+]
+
+
+def make_pages(n_pages, seed=SEED):
+    """[PageText] with body text, ~ANCHORS_PER_PAGE anchors and one large heading per page."""
+    rng = random.Random(seed)
+    pages = []
+    for i in range(n_pages):
+        if rng.random() < EMPTY_PAGE_RATE:
+            pages.append(PageText(i, "", []))
+            continue
+        lines = [rng.choice(BODY_SENTENCES) for _ in range(40)]
+        for _ in range(rng.randint(0, 2 * ANCHORS_PER_PAGE)):
+            lines.insert(rng.randrange(len(lines) + 1), rng.choice(ANCHOR_PHRASES))
+        heading = rng.choice(HEADINGS)
+        pages.append(PageText(i, "\n".join(lines) + "\n", [(14.0, heading), (8.0, lines[0])]))
+    return pages
+
+
+# --- pre-change implementation (05_segment_reports.segment_pages, steps 2 and 3) ---
+def legacy_anchors(pages):
+    offsets = page_offsets(pages)
+    joined = "".join(p.text for p in pages)
+    regex_hits = []
+    for pat, label in seg.SECTION_PATTERNS:
+        for m in re.finditer(pat, joined, flags=re.I):
+            char_idx = m.start()
+            page_idx = 0
+            for j in range(len(offsets)-1, -1, -1):
+                if char_idx >= offsets[j]:
+                    page_idx = j
+                    break
+            regex_hits.append((page_idx, label))
+    regex_hits.sort()
+    return regex_hits
+
+
+def legacy_heading_label(txt):
+    norm = txt.lower()
+    label = None
+    if re.search(r"risk\s+factors", norm): label = "Risk Factors"
+    elif re.search(r"management.?s.*discussion.*analysis", norm): label = "MD&A"
+    elif re.search(r"financial\s+statements", norm): label = "Financial Statements"
+    elif re.search(r"\bitem\s+7a\b", norm): label = "MD&A Supplement"
+    elif re.search(r"\bitem\s+7\b", norm): label = "MD&A"
+    elif re.search(r"\bitem\s+8\b", norm): label = "Financial Statements"
+    elif re.search(r"\bitem\s+1\b", norm): label = "Business"
+    return label
+
+
+def current_anchors(pages):
+    return sorted((pg, label) for pg, _, _, label in seg.find_anchors(pages))
+
+
+def headings_of(pages):
+    return [text for p in pages for _, text in p.blocks]
+
+
+def timed(fn, arg, repeats=REPEATS):
+    times, result = [], None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn(arg)
+        times.append(time.perf_counter() - t0)
+    return result, min(times)
+
+
+def check_spans(pages):
+    """Every returned span is an anchor, and its page contains its start offset."""
+    offsets = page_offsets(pages)
+    joined = "".join(p.text for p in pages)
+    for pg, start, end, label in seg.find_anchors(pages):
+        if not (offsets[pg] <= start < offsets[pg] + len(pages[pg].text)):
+            return False
+        if seg.SECTION_RULES.first(joined[start:end]) is None:
+            return False
+    return True
+
+
+def main():
+    results = []
+    for n_pages in DOC_PAGES:
+        pages = make_pages(n_pages)
+        n_chars = sum(len(p.text) for p in pages)
+        print(f"🔹 {n_pages} pages ({n_chars / 1e6:.1f}M chars)...")
+
+        legacy, legacy_s = timed(legacy_anchors, pages)
+        current, current_s = timed(current_anchors, pages)
+
+        headings = headings_of(pages)
+        legacy_labels, legacy_h_s = timed(lambda hs: [legacy_heading_label(h) for h in hs], headings)
+        current_labels, current_h_s = timed(lambda hs: [seg.heading_label(h) for h in hs], headings)
+
+        offsets = page_offsets(pages)
+        probes = list(range(0, n_chars, max(1, n_chars // 5000)))
+        linear_pages = [next(j for j in range(len(offsets)-1, -1, -1) if c >= offsets[j]) for c in probes]
+        bisect_pages = [seg.page_of(offsets, c) for c in probes]
+
+        r = {
+            "pages": n_pages,
+            "chars": n_chars,
+            "anchors": len(current),
+            "legacy_anchor_seconds": round(legacy_s, 4),
+            "combined_anchor_seconds": round(current_s, 4),
+            "anchor_speedup": round(legacy_s / max(current_s, 1e-9), 2),
+            "headings": len(headings),
+            "legacy_heading_seconds": round(legacy_h_s, 4),
+            "combined_heading_seconds": round(current_h_s, 4),
+            "heading_speedup": round(legacy_h_s / max(current_h_s, 1e-9), 2),
+            "identical_anchors": legacy == current,
+            "identical_heading_labels": legacy_labels == current_labels,
+            "identical_page_lookup": linear_pages == bisect_pages,
+            "spans_valid": check_spans(pages),
+        }
+        results.append(r)
+        print(f"⏱️ anchors: {len(current)} in {legacy_s:.3f}s → {current_s:.3f}s (x{r['anchor_speedup']}); "
+              f"headings: {len(headings)} in {legacy_h_s:.3f}s → {current_h_s:.3f}s (x{r['heading_speedup']})")
+        if not all(r[k] for k in ("identical_anchors", "identical_heading_labels", "identical_page_lookup", "spans_valid")):
+            print("[WARN] Anchors, heading labels or page lookups differ between versions")
+
+    report = {"repeats": REPEATS, "anchors_per_page": ANCHORS_PER_PAGE,
+              "empty_page_rate": EMPTY_PAGE_RATE, "cpu_count": os.cpu_count(), "documents": results}
+    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"💾 Saved to {OUTPUT_PATH}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# a:\Infosys\scripts\bench_event_classifiers.py
+"""
+Accuracy vs throughput of the two model fallbacks in 03_event_extraction.py:
+the bart-large-mnli zero-shot pipeline and the label-embedding bi-encoder.
+
+There are no gold event labels, so the held-out sample uses rule hits as
+silver labels: sentences matched by EVENT_PATTERNS are scored on whether the
+model's top label is one of the rule labels. A second sample of rule misses
+(the sentences the fallback actually sees in production) measures how often
+the bi-encoder agrees with the zero-shot model.
+"""
+import os
+import json
+import time
+import importlib
+import pandas as pd
+
+events = importlib.import_module("03_event_extraction")
+
+# === CONFIG ===
+DATA_PATH = events.DATA_PATH
+OUTPUT_PATH = r"A:\Infosys\outputs\benchmarks\event_classifier_comparison.json"
+SAMPLE_SIZE = 300   # per sample (rule hits / rule misses)
+SEED = 42
+
+# EVENT_PATTERNS keys that differ from the EVENT_LABELS wording
+PATTERN_TO_LABEL = {"IPO": "initial public offering (IPO)"}
+
+
+def timed(fn, texts):
+    t0 = time.perf_counter()
+    out = fn(texts)
+    elapsed = time.perf_counter() - t0
+    return out, elapsed
+
+
+def summarize(name, top_labels, top_scores, threshold, silver, elapsed, n_texts, passes_per_sentence):
+    correct = [label in gold for label, gold in zip(top_labels, silver)]
+    accepted = [s > threshold for s in top_scores]
+    accepted_correct = [c for c, a in zip(correct, accepted) if a]
+    return {
+        "model": name,
+        "top1_accuracy": round(sum(correct) / len(correct), 4),
+        "coverage_at_threshold": round(sum(accepted) / len(accepted), 4),
+        "precision_at_threshold": round(sum(accepted_correct) / len(accepted_correct), 4) if accepted_correct else None,
+        "threshold": threshold,
+        "sentences_per_sec": round(n_texts / elapsed, 2),
+        "forward_passes_per_sentence": passes_per_sentence,
+    }
+
+
+def main():
+    df = pd.read_csv(DATA_PATH)
+    rule_labels = events.EVENT_RULES.labels_series(df['text'])
+    hits = df[rule_labels.map(bool)].sample(n=min(SAMPLE_SIZE, int(rule_labels.map(bool).sum())), random_state=SEED)
+    misses = df[~rule_labels.map(bool)].sample(n=min(SAMPLE_SIZE, int((~rule_labels.map(bool)).sum())), random_state=SEED)
+    silver = [{PATTERN_TO_LABEL.get(l, l) for l in rule_labels[i]} for i in hits.index]
+    hit_texts = hits['text'].astype(str).tolist()
+    miss_texts = misses['text'].astype(str).tolist()
+    print(f"🔹 Held-out sample: {len(hit_texts)} rule hits, {len(miss_texts)} rule misses")
+
+    # --- zero-shot cross-encoder (cache bypassed so timings are real) ---
+    zs = lambda texts: events.zero_shot_results(texts, use_cache=False)
+    events.get_event_classifier()  # load outside the timed region
+    zs_hits, zs_time = timed(zs, hit_texts)
+    zs_misses, _ = timed(zs, miss_texts)
+    zero_shot = summarize(
+        events.ZERO_SHOT_MODEL,
+        [r['labels'][0] for r in zs_hits], [r['scores'][0] for r in zs_hits],
+        events.SCORE_THRESHOLD, silver, zs_time, len(hit_texts), len(events.EVENT_LABELS)
+    )
+
+    # --- label-embedding bi-encoder ---
+    clf = events.get_embedding_classifier()
+    emb_hits, emb_time = timed(clf.scores, hit_texts)
+    emb_misses, _ = timed(clf.scores, miss_texts)
+    best_scores, best_idx = emb_hits.max(dim=1)
+    embedding = summarize(
+        events.EMBEDDING_MODEL,
+        [events.EVENT_LABELS[i] for i in best_idx.tolist()], best_scores.tolist(),
+        events.EMBEDDING_THRESHOLD, silver, emb_time, len(hit_texts), 1
+    )
+
+    # --- agreement on the sentences the fallback actually handles ---
+    miss_best = [events.EVENT_LABELS[i] for i in emb_misses.argmax(dim=1).tolist()]
+    agreement = sum(a == r['labels'][0] for a, r in zip(miss_best, zs_misses)) / len(miss_texts) if miss_texts else None
+
+    report = {
+        "sample": {"rule_hits": len(hit_texts), "rule_misses": len(miss_texts), "seed": SEED},
+        "zero_shot": zero_shot,
+        "embedding": embedding,
+        "top1_agreement_on_rule_misses": round(agreement, 4) if agreement is not None else None,
+        "speedup": round(embedding["sentences_per_sec"] / zero_shot["sentences_per_sec"], 2),
+    }
+    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"💾 Saved to {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# a:\Infosys\scripts\bench_segmentation.py
+"""
+Segmentation time of 05_segment_reports.py on a large report: the old
+three-pass extraction vs the single pass through pdf_pages.read_pages().
+
+The old code parsed every page with get_text("dict") for headings, parsed
+every page again with get_text() for regex anchors, and then called
+get_text() once more for each page of each saved section. That version is
+kept below as legacy_sections(), so both can run on the same PDF. Without
+BENCH_PDF, a synthetic 10-K of SYNTHETIC_PAGES pages is generated, with
+a table of contents, section headings and body text. Both versions must
+produce the same sections and section texts.
+
+The single pass is also timed with the page ranges read by WORKER_COUNTS
+processes, and each of those runs must match the sequential output.
+"""
+import os
+import re
+import json
+import time
+import random
+import tempfile
+import importlib
+from functools import partial
+from collections import defaultdict
+import fitz  # PyMuPDF
+
+seg = importlib.import_module("05_segment_reports")
+
+# === CONFIG ===
+BENCH_PDF = None   # a real report to time; None = generate a synthetic one
+SYNTHETIC_PAGES = 300
+REPEATS = 3
+WORKER_COUNTS = (2, 4, os.cpu_count() or 1)
+SEED = 42
+OUTPUT_PATH = r"A:\Infosys\outputs\benchmarks\segmentation.json"
+
+# page -> heading of the section starting there (scaled to SYNTHETIC_PAGES)
+SYNTHETIC_SECTIONS = [
+    (0.02, "Item 1. Business"),
+    (0.12, "Item 1A. Risk Factors"),
+    (0.40, "Item 7. Management's Discussion and Analysis of Financial Condition"),
+    (0.60, "Item 7A. Quantitative and Qualitative Disclosures About Market Risk"),
+    (0.66, "Item 8. Financial Statements and Supplementary Data"),
+    (0.93, "Item 9. Changes in and Disagreements With Accountants"),
+]
+BODY_SENTENCES = [
+    "Net revenue increased 8% compared to the prior fiscal year, driven by higher services volume.",
+    "Operating expenses were $4.2 billion, reflecting continued investment in research and development.",
+    "We are exposed to foreign currency exchange rate fluctuations in our international operations.",
+    "Gross margin decreased due to higher component costs and an unfavorable product mix.",
+    "The Company repurchased 12 million shares of common stock for $1.9 billion during the year.",
+    "Cash, cash equivalents and marketable securities totaled $48.3 billion at year end.",
+    "Deferred revenue primarily consists of amounts billed for subscription and support contracts.",
+]
+
+
+def make_report_pdf(path, pages=SYNTHETIC_PAGES, seed=SEED):
+    rng = random.Random(seed)
+    starts = {max(1, int(frac * pages)): title for frac, title in SYNTHETIC_SECTIONS}
+    doc = fitz.open()
+    toc = doc.new_page()
+    toc.insert_text((72, 72), "Table of Contents", fontsize=16)
+    for i, (_, title) in enumerate(SYNTHETIC_SECTIONS):
+        toc.insert_text((72, 110 + 18 * i), title, fontsize=9)
+    for p in range(1, pages):
+        page = doc.new_page()
+        y = 72
+        if p in starts:
+            page.insert_text((72, y), starts[p], fontsize=14)
+            y += 30
+        while y < 760:
+            page.insert_text((72, y), rng.choice(BODY_SENTENCES), fontsize=8)
+            y += 12
+    doc.save(path)
+    doc.close()
+
+
+# --- pre-change implementation, verbatim apart from the return values ---
+def legacy_sections(pdf_path):
+    doc = fitz.open(pdf_path)
+    heading_candidates = []
+    for i, page in enumerate(doc):
+        blocks = page.get_text("dict")["blocks"]
+        for b in blocks:
+            if "lines" not in b:
+                continue
+            sizes = []
+            text_buf = []
+            for l in b["lines"]:
+                for s in l["spans"]:
+                    sizes.append(s["size"])
+                    text_buf.append(s["text"])
+            if not sizes:
+                continue
+            avg_size = sum(sizes)/len(sizes)
+            text = " ".join(text_buf).strip()
+            if len(text) > 0 and len(text) < 180 and avg_size >= 10.5:
+                heading_candidates.append((i, avg_size, text))
+
+    full_text = []
+    page_offsets = []
+    acc = 0
+    for i, page in enumerate(doc):
+        t = page.get_text()
+        full_text.append(t)
+        page_offsets.append(acc)
+        acc += len(t)
+    joined = "".join(full_text)
+
+    regex_hits = []
+    for pat, label in seg.SECTION_PATTERNS:
+        for m in re.finditer(pat, joined, flags=re.I):
+            char_idx = m.start()
+            page_idx = 0
+            for j in range(len(page_offsets)-1, -1, -1):
+                if char_idx >= page_offsets[j]:
+                    page_idx = j
+                    break
+            regex_hits.append((page_idx, label))
+    regex_hits.sort()
+
+    normalized_headings = []
+    for (pg, size, txt) in heading_candidates:
+        norm = txt.lower()
+        label = None
+        if re.search(r"risk\s+factors", norm): label = "Risk Factors"
+        elif re.search(r"management.?s.*discussion.*analysis", norm): label = "MD&A"
+        elif re.search(r"financial\s+statements", norm): label = "Financial Statements"
+        elif re.search(r"\bitem\s+7a\b", norm): label = "MD&A Supplement"
+        elif re.search(r"\bitem\s+7\b", norm): label = "MD&A"
+        elif re.search(r"\bitem\s+8\b", norm): label = "Financial Statements"
+        elif re.search(r"\bitem\s+1\b", norm): label = "Business"
+        if label:
+            normalized_headings.append((pg, label))
+
+    candidates = sorted(set(regex_hits + normalized_headings))
+    if not candidates:
+        ranges = {"Body": [(0, len(doc)-1)]}
+    else:
+        ranges = defaultdict(list)
+        for idx, (pg, label) in enumerate(candidates):
+            start = pg
+            end = candidates[idx+1][0]-1 if idx+1 < len(candidates) else len(doc)-1
+            if start <= end:
+                ranges[label].append((start, end))
+        for k, spans in list(ranges.items()):
+            ranges[k] = seg.union_by_pages(spans)
+
+    texts = {}
+    for label, spans in ranges.items():
+        for (s, e) in spans:
+            buf = []
+            for p in range(s, e+1):
+                buf.append(doc[p].get_text())
+            texts[(label, s, e)] = "\n".join(buf)
+    return texts
+
+
+def current_sections(pdf_path, num_workers=1):
+    ranges, pages = seg.extract_pdf_sections(pdf_path, num_workers)
+    return {(label, s, e): "\n".join(pages[p].text for p in range(s, e+1))
+            for label, spans in ranges.items() for (s, e) in spans}
+
+
+def timed(fn, pdf_path, repeats):
+    times, result = [], None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn(pdf_path)
+        times.append(time.perf_counter() - t0)
+    return result, min(times)
+
+
+def main():
+    tmp_dir = None
+    pdf_path = BENCH_PDF
+    if pdf_path is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        pdf_path = os.path.join(tmp_dir.name, "synthetic_10k.pdf")
+        print(f"🔹 Generating a {SYNTHETIC_PAGES}-page synthetic report...")
+        make_report_pdf(pdf_path)
+    with fitz.open(pdf_path) as doc:
+        n_pages = len(doc)
+
+    legacy, legacy_s = timed(legacy_sections, pdf_path, REPEATS)
+    current, current_s = timed(current_sections, pdf_path, REPEATS)
+    identical = legacy == current
+    parallel = {}
+    for n in sorted(set(WORKER_COUNTS)):
+        if n > 1:
+            result, seconds = timed(partial(current_sections, num_workers=n), pdf_path, REPEATS)
+            parallel[n] = {"seconds": round(seconds, 3), "speedup": round(current_s / max(seconds, 1e-9), 2),
+                           "identical_output": result == current}
+
+    report = {
+        "pdf": BENCH_PDF or f"synthetic ({SYNTHETIC_PAGES} pages)",
+        "pages": n_pages,
+        "sections": len(current),
+        "repeats": REPEATS,
+        "legacy_seconds": round(legacy_s, 3),
+        "single_pass_seconds": round(current_s, 3),
+        "speedup": round(legacy_s / max(current_s, 1e-9), 2),
+        "legacy_ms_per_page": round(legacy_s * 1000 / n_pages, 2),
+        "single_pass_ms_per_page": round(current_s * 1000 / n_pages, 2),
+        "identical_output": identical,
+        "cpu_count": os.cpu_count(),
+        "parallel": parallel,
+    }
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+    print(f"⏱️ {n_pages} pages, {len(current)} sections: legacy {legacy_s:.2f}s, "
+          f"single pass {current_s:.2f}s (x{report['speedup']})")
+    for n, r in parallel.items():
+        print(f"⏱️ {n} workers: {r['seconds']:.2f}s (x{r['speedup']} vs 1 worker)")
+    if not identical or not all(r["identical_output"] for r in parallel.values()):
+        print("[WARN] Section ranges or texts differ between versions")
+    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"💾 Saved to {OUTPUT_PATH}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
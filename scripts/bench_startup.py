@@ -0,0 +1,155 @@
+# a:\Infosys\scripts\bench_startup.py
+"""
+Startup-time audit of the scripts and modules: every target runs in a fresh
+interpreter, the way a CLI call or a container cold start would.
+
+For every target it records:
+- the median and minimum wall time over REPEATS runs
+- total import time and the slowest top-level imports, taken from
+  `python -X importtime`
+- which heavy packages (torch, transformers, ...) were imported at all
+
+    python bench_startup.py                       # all targets, writes OUTPUT_PATH
+    python bench_startup.py --baseline old.json   # also prints the speedup per target
+
+To measure an improvement, run it once on the old tree with -o old.json,
+and then again on the new tree with --baseline old.json.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import numpy as np
+
+# === CONFIG ===
+OUTPUT_PATH = r"A:\Infosys\outputs\benchmarks\startup_times.json"
+REPEATS = 5
+SLOWEST_IMPORTS = 8
+HEAVY_PACKAGES = ("torch", "transformers", "datasets", "sklearn", "matplotlib", "wordcloud",
+                  "onnxruntime", "textattack", "yfinance", "fitz", "pdfplumber")
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_code(module):
+    # numbered and hyphenated script names are not valid identifiers, so import through importlib
+    return f"import importlib; importlib.import_module({module!r})"
+
+
+# name -> interpreter arguments; run with SCRIPTS_DIR as the working directory
+TARGETS = {
+    "python": ["-c", "pass"],
+    "import inference_backends": ["-c", import_code("inference_backends")],
+    "import 03_event_extraction": ["-c", import_code("03_event_extraction")],
+    "import financial_entity_event_extractor": ["-c", import_code("financial_entity_event_extractor")],
+    "import user-entity": ["-c", import_code("user-entity")],
+    "import 05_eval_fiqa": ["-c", import_code("05_eval_fiqa")],
+    "import finetune_fiqa": ["-c", import_code("finetune_fiqa")],
+    "import 03_train_finbert": ["-c", import_code("03_train_finbert")],
+    "import distill_finbert": ["-c", import_code("distill_finbert")],
+    "import 04_augment_data": ["-c", import_code("04_augment_data")],
+    "import export_finbert_onnx": ["-c", import_code("export_finbert_onnx")],
+    "import test_model": ["-c", import_code("test_model")],
+    "import 04 helpers": ["-c", "import quote_cache, quote_fetcher, entity_linker, price_store"],
+    "score.py --help": ["score.py", "--help"],
+    "inference_server.py --help": ["inference_server.py", "--help"],
+}
+
+
+def run_once(args):
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable] + args, cwd=SCRIPTS_DIR,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return time.perf_counter() - t0, proc
+
+
+def parse_importtime(stderr):
+    """
+    ({module: cumulative microseconds} for top-level imports, set of every
+    imported module name) from the output of `python -X importtime`.
+    """
+    top_level, modules = {}, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue   # the header line
+        modules.add(name.strip())
+        if not name[1:].startswith(" "):   # nested imports are indented by two more spaces
+            top_level[name.strip()] = top_level.get(name.strip(), 0) + int(cumulative)
+    return top_level, modules
+
+
+def bench_target(args, repeats):
+    run_once(args)   # warm the OS file cache and the .pyc files
+    times, proc = [], None
+    for _ in range(repeats):
+        elapsed, proc = run_once(args)
+        times.append(elapsed)
+    _, traced = run_once(["-X", "importtime"] + args)
+    top_level, modules = parse_importtime(traced.stderr)
+    slowest = sorted(top_level.items(), key=lambda kv: -kv[1])[:SLOWEST_IMPORTS]
+
+    result = {
+        "args": args,
+        "ok": proc.returncode == 0,
+        "wall_ms_median": round(float(np.median(times)) * 1000, 1),
+        "wall_ms_min": round(min(times) * 1000, 1),
+        "import_ms": round(sum(top_level.values()) / 1000, 1),
+        "modules_imported": len(modules),
+        "heavy_packages": sorted({m.split(".")[0] for m in modules} & set(HEAVY_PACKAGES)),
+        "slowest_imports_ms": {name: round(us / 1000, 1) for name, us in slowest},
+    }
+    if proc.returncode != 0:
+        result["error"] = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start and import times of the scripts.")
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--only", nargs="+", choices=sorted(TARGETS), help="run only these targets")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["targets"]
+
+    results = {}
+    for name in args.only or TARGETS:
+        result = bench_target(TARGETS[name], args.repeats)
+        old = baseline.get(name)
+        if old:
+            result["baseline_wall_ms_median"] = old["wall_ms_median"]
+            result["speedup"] = round(old["wall_ms_median"] / max(result["wall_ms_median"], 1e-9), 2)
+        results[name] = result
+        status = "✅" if result["ok"] else "❌"
+        line = f"{status} {name:<42} {result['wall_ms_median']:>8.1f} ms  (imports {result['import_ms']:.1f} ms)"
+        if old:
+            line += f"  was {old['wall_ms_median']:.1f} ms, x{result['speedup']}"
+        if result["heavy_packages"]:
+            line += f"  heavy: {', '.join(result['heavy_packages'])}"
+        print(line)
+        if not result["ok"]:
+            print(f"   [WARN] {result['error']}")
+
+    report = {
+        "python": sys.version.split()[0],
+        "executable": sys.executable,
+        "repeats": args.repeats,
+        "targets": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Saved to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# a:\Infosys\scripts\distill_finbert.py
+"""
+Distills the fine-tuned FinBERT sentiment model (the teacher) into a small
+student for fast CPU scoring.
+
+The student has the teacher's config with fewer encoder layers and starts
+from the teacher's embeddings, an evenly spaced subset of its layers, and
+its pooler and classifier. It trains on FinancialPhraseBank plus the
+augmented rows from 04_augment_data.py, using a mix of two losses:
+  - KL divergence to the teacher's temperature-softened probabilities
+    (teacher logits are computed once, up front)
+  - cross-entropy against the gold label
+
+The test split is held-out originals, and their augmented variants are
+kept out of training. The teacher was trained by 03_train_finbert.py on its
+own split, so its accuracy here is optimistic. Accuracy, single-headline
+latency (p50/p95) and batched throughput are reported for the teacher, the
+student, and the int8-quantized student.
+"""
+import os
+import re
+import copy
+import json
+import time
+import numpy as np
+import pandas as pd
+from inference_backends import quantize_dynamic, predict_proba
+from token_cache import load_tokenized
+
+# === CONFIG ===
+DATA_PATH = r"A:\Infosys\data\processed\preprocessed_fiqa.csv"
+AUG_DATA_PATH = r"A:\Infosys\data\augmented\augmented_fiqa.csv"   # originals first, then augmented rows
+TEACHER_DIR = r"A:\Infosys\models\finbert_improved"
+BASE_MODEL = "yiyanghkust/finbert-tone"                            # tokenizer
+STUDENT_DIR = r"A:\Infosys\models\finbert_student"
+REPORT_PATH = r"A:\Infosys\outputs\benchmarks\finbert_distillation.json"
+STUDENT_LAYERS = 4
+TEMPERATURE = 2.0
+ALPHA = 0.7            # weight of the soft (teacher) loss, 1 - ALPHA for the gold labels
+MAX_LENGTH = 128
+BATCH_SIZE = 32
+EPOCHS = 4
+LEARNING_RATE = 5e-5
+N_LATENCY = 200        # test headlines scored one at a time for p50/p95
+
+
+def student_from_teacher(teacher, num_layers):
+    """Teacher config with `num_layers` layers, initialized from evenly spaced teacher layers."""
+    from transformers import AutoModelForSequenceClassification
+    config = copy.deepcopy(teacher.config)
+    teacher_layers = config.num_hidden_layers
+    config.num_hidden_layers = num_layers
+    student = AutoModelForSequenceClassification.from_config(config)
+
+    # student layer i <- teacher layer picks[i] (e.g. 2, 5, 8, 11 for 4 of 12)
+    picks = [(i + 1) * teacher_layers // num_layers - 1 for i in range(num_layers)]
+    layer_of = {teacher_layer: i for i, teacher_layer in enumerate(picks)}
+    layer_key = re.compile(r"encoder\.layer\.(\d+)\.")
+    state = {}
+    for key, value in teacher.state_dict().items():
+        m = layer_key.search(key)
+        if m is None:
+            state[key] = value
+        elif int(m.group(1)) in layer_of:
+            state[layer_key.sub(f"encoder.layer.{layer_of[int(m.group(1))]}.", key, count=1)] = value
+    student.load_state_dict(state)
+    print(f"🔹 Student: {num_layers} layers from teacher layers {picks} "
+          f"({student.num_parameters() / 1e6:.1f}M vs {teacher.num_parameters() / 1e6:.1f}M params)")
+    return student
+
+
+def predict_logits(model, dataset, tokenizer, batch_size=64):
+    """Logits for every row of a tokenized dataset, batched in length order."""
+    import torch
+    from transformers import DataCollatorWithPadding
+    collator = DataCollatorWithPadding(tokenizer)
+    order = np.argsort(dataset["length"])
+    logits = np.zeros((len(dataset), model.config.num_labels), dtype=np.float32)
+    keys = [k for k in ("input_ids", "token_type_ids", "attention_mask") if k in dataset.column_names]
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            rows = dataset[idx.tolist()]
+            batch = collator([{k: rows[k][i] for k in keys} for i in range(len(idx))])
+            logits[idx] = model(**batch).logits.float().numpy()
+    return logits
+
+
+def benchmark(name, model, tokenizer, texts, labels):
+    """Accuracy, per-headline latency percentiles and batched throughput on CPU."""
+    t0 = time.perf_counter()
+    probs = predict_proba(model, tokenizer, texts, batch_size=BATCH_SIZE, max_length=MAX_LENGTH)
+    batched_seconds = time.perf_counter() - t0
+
+    latencies = []
+    for text in texts[:N_LATENCY]:
+        t0 = time.perf_counter()
+        predict_proba(model, tokenizer, [text], batch_size=1, max_length=MAX_LENGTH)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    result = {
+        "accuracy": float((probs.argmax(axis=1) == np.asarray(labels)).mean()),
+        "latency_ms_p50": float(np.percentile(latencies, 50)),
+        "latency_ms_p95": float(np.percentile(latencies, 95)),
+        "throughput_per_sec": len(texts) / batched_seconds,
+    }
+    print(f"  {name:<17} acc {result['accuracy']:.4f} | p50 {result['latency_ms_p50']:.2f} ms | "
+          f"p95 {result['latency_ms_p95']:.2f} ms | {result['throughput_per_sec']:.0f} sentences/s")
+    return result
+
+
+def main():
+    # torch, sklearn, transformers and the trainer helpers are imported here, not at module load
+    import torch
+    import torch.nn.functional as F
+    from sklearn.model_selection import train_test_split
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification, TrainingArguments, DataCollatorWithPadding
+    from training_utils import LengthGroupedTrainer
+
+    class DistillationTrainer(LengthGroupedTrainer):
+        def compute_loss(self, model, inputs, return_outputs=False, *args, **kwargs):
+            teacher_logits = inputs.pop("teacher_logits")
+            inputs.pop("length", None)
+            labels = inputs.pop("labels")
+            outputs = model(**inputs)
+            soft = F.kl_div(
+                F.log_softmax(outputs.logits / TEMPERATURE, dim=-1),
+                F.softmax(teacher_logits / TEMPERATURE, dim=-1),
+                reduction="batchmean",
+            ) * TEMPERATURE ** 2
+            hard = F.cross_entropy(outputs.logits, labels)
+            loss = ALPHA * soft + (1 - ALPHA) * hard
+            return (loss, outputs) if return_outputs else loss
+
+    df = pd.read_csv(DATA_PATH)
+    # same label ids as 03_train_finbert.py
+    label_map = {label: i for i, label in enumerate(df['label'].unique())}
+    df['label_id'] = df['label'].map(label_map)
+    train_df, test_df = train_test_split(df, test_size=0.2, stratify=df['label_id'], random_state=42)
+
+    tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL)
+    teacher = AutoModelForSequenceClassification.from_pretrained(TEACHER_DIR).eval()
+
+    # --- training rows: train originals + augmentations of train originals only ---
+    base = load_tokenized(DATA_PATH, BASE_MODEL, MAX_LENGTH)
+    train_parts = [base.select(train_df.index.tolist()).add_column("labels", train_df['label_id'].tolist())]
+    aug_df = pd.read_csv(AUG_DATA_PATH) if os.path.exists(AUG_DATA_PATH) else None
+    if aug_df is None:
+        print(f"[WARN] {AUG_DATA_PATH} not found, distilling on FinancialPhraseBank only")
+    elif 'source_idx' not in aug_df.columns:
+        print(f"[WARN] {AUG_DATA_PATH} has no source_idx column; re-run 04_augment_data.py. "
+              f"Distilling on FinancialPhraseBank only")
+    else:
+        aug_df = aug_df.iloc[len(df):]
+        aug_df = aug_df[aug_df['label'].isin(label_map)]
+        # source_idx is the DATA_PATH row each variant was made from (written by 04_augment_data.py)
+        keep = aug_df[aug_df['source_idx'].isin(set(train_df.index))]
+        print(f"🔹 Augmented rows: {len(keep)} kept, {len(aug_df) - len(keep)} dropped (variants of test rows)")
+        aug = load_tokenized(AUG_DATA_PATH, BASE_MODEL, MAX_LENGTH).select(keep.index.tolist())
+        train_parts.append(aug.add_column("labels", keep['label'].map(label_map).tolist()))
+
+    from datasets import concatenate_datasets
+    train_dataset = concatenate_datasets(train_parts).remove_columns(["text"])
+
+    print(f"🔹 Computing teacher logits for {len(train_dataset)} training rows...")
+    teacher_logits = predict_logits(teacher, train_dataset, tokenizer)
+    train_dataset = train_dataset.add_column("teacher_logits", teacher_logits.tolist())
+
+    # --- train the student ---
+    student = student_from_teacher(teacher, STUDENT_LAYERS)
+    training_args = TrainingArguments(
+        output_dir=STUDENT_DIR,
+        learning_rate=LEARNING_RATE,
+        per_device_train_batch_size=BATCH_SIZE,
+        num_train_epochs=EPOCHS,
+        weight_decay=0.01,
+        warmup_ratio=0.06,
+        save_strategy="no",
+        logging_steps=50,
+        remove_unused_columns=False,   # keep teacher_logits for compute_loss
+    )
+    trainer = DistillationTrainer(
+        model=student,
+        args=training_args,
+        train_dataset=train_dataset,
+        data_collator=DataCollatorWithPadding(tokenizer),
+    )
+    trainer.train()
+    trainer.save_model(STUDENT_DIR)
+    tokenizer.save_pretrained(STUDENT_DIR)
+    print(f"💾 Student saved to {STUDENT_DIR}")
+
+    # --- teacher vs student on held-out originals (CPU) ---
+    student = student.cpu().eval()
+    texts = test_df['text'].astype(str).tolist()
+    labels = test_df['label_id'].tolist()
+    print(f"\n🔹 Benchmarking on {len(texts)} held-out sentences ({torch.get_num_threads()} threads)")
+    report = {
+        "teacher_layers": teacher.config.num_hidden_layers,
+        "student_layers": STUDENT_LAYERS,
+        "test_rows": len(texts),
+        "teacher": benchmark("teacher", teacher, tokenizer, texts, labels),
+        "student": benchmark("student", student, tokenizer, texts, labels),
+        "student_quantized": benchmark("student (int8)", quantize_dynamic(student), tokenizer, texts, labels),
+    }
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    with open(REPORT_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Report saved to {REPORT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
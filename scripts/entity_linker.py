@@ -0,0 +1,178 @@
+import re
+from collections import deque
+
+# Trailing words dropped from listed names to get the name people write ("Apple Inc." -> "apple")
+CORPORATE_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "companies", "ltd", "limited",
+    "plc", "llc", "lp", "sa", "ag", "nv", "se", "group", "holding", "holdings",
+}
+
+
+class AhoCorasick:
+    """
+    Multi-pattern string matcher: one pass over the text finds every
+    occurrence of every pattern, whatever the number of patterns.
+    """
+
+    def __init__(self):
+        self.goto = [{}]      # state -> {char: next state}
+        self.fail = [0]
+        self.out = [[]]       # state -> [(pattern length, value)], including suffix matches
+        self.built = False
+
+    def add(self, pattern, value):
+        state = 0
+        for ch in pattern:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].append((len(pattern), value))
+        self.built = False
+
+    def build(self):
+        queue = deque(self.goto[0].values())
+        for state in queue:
+            self.fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+        self.built = True
+
+    def iter(self, text):
+        """Yields (start, end, value) for every occurrence, in order of end position."""
+        if not self.built:
+            self.build()
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for length, value in out[state]:
+                    yield i + 1 - length, i + 1, value
+
+
+def normalize_alias(alias):
+    return re.sub(r"\s+", " ", str(alias).strip().lower())
+
+
+def name_aliases(name):
+    """Lowercase variants of a listed company name, with corporate suffixes stripped."""
+    tokens = normalize_alias(name).split(" ")
+    aliases = {" ".join(tokens)}
+    while tokens:
+        tokens[-1] = tokens[-1].rstrip(".,")
+        aliases.add(" ".join(tokens))
+        if len(tokens) > 1 and tokens[-1] in CORPORATE_SUFFIXES:
+            tokens = tokens[:-1]
+            aliases.add(" ".join(tokens).rstrip(","))
+        else:
+            break
+    aliases |= {a[4:] for a in aliases if a.startswith("the ")}
+    return {a for a in aliases if a}
+
+
+def _lower_same_length(text):
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # a few characters (e.g. 'İ') lowercase to two; keep them so spans stay aligned
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class EntityLinker:
+    """
+    Links company mentions in text to tickers with an Aho-Corasick automaton
+    over all aliases, so the cost is one pass per sentence however large the
+    listing. Matches are case-insensitive, must sit on word boundaries
+    ("meta" does not match inside "metal"), and overlapping candidates are
+    resolved leftmost-longest ("bank of america" beats "america").
+
+    Every ticker is also reachable by its cashtag ("$AAPL"). When an alias
+    is shared by several tickers, the first one listed wins.
+    """
+
+    def __init__(self, aliases, names=None, min_alias_len=2):
+        self.names = dict(names or {})
+        self.aliases = {}
+        for alias, ticker in aliases.items():
+            alias = normalize_alias(alias)
+            if len(alias) >= min_alias_len and alias not in self.aliases:
+                self.aliases[alias] = ticker
+        for ticker in set(self.aliases.values()) | set(self.names):
+            self.aliases.setdefault("$" + ticker.lower(), ticker)
+        self.automaton = AhoCorasick()
+        for alias, ticker in self.aliases.items():
+            self.automaton.add(alias, ticker)
+        self.automaton.build()
+
+    @classmethod
+    def from_mapping(cls, alias_to_ticker):
+        """From a {alias: ticker} dict such as company_ticker_map; the first alias names the company."""
+        names = {}
+        for alias, ticker in alias_to_ticker.items():
+            names.setdefault(ticker, alias.title())
+        return cls(alias_to_ticker, names)
+
+    @classmethod
+    def from_csv(cls, path, min_alias_len=2):
+        """
+        From an exchange listing CSV with columns ticker, name and optionally
+        aliases ('|'-separated extra names, e.g. brands or former names).
+        """
+        import pandas as pd
+        listing = pd.read_csv(path, dtype=str, keep_default_na=False)
+        aliases, names = {}, {}
+        for row in listing.itertuples(index=False):
+            ticker = row.ticker.strip().upper()
+            if not ticker:
+                continue
+            names.setdefault(ticker, row.name.strip())
+            for alias in name_aliases(row.name):
+                aliases.setdefault(alias, ticker)
+            for alias in str(getattr(row, "aliases", "") or "").split("|"):
+                if alias.strip():
+                    aliases.setdefault(normalize_alias(alias), ticker)
+        return cls(aliases, names, min_alias_len=min_alias_len)
+
+    def find(self, text):
+        """[(start, end, ticker, matched text)] for all non-overlapping mentions, left to right."""
+        if not isinstance(text, str) or not text:
+            return []
+        lowered = _lower_same_length(text)
+        n = len(text)
+        candidates = [
+            (start, end, ticker) for start, end, ticker in self.automaton.iter(lowered)
+            if (start == 0 or not lowered[start - 1].isalnum()) and (end == n or not lowered[end].isalnum())
+        ]
+        candidates.sort(key=lambda m: (m[0], m[0] - m[1]))
+        matches, last_end = [], 0
+        for start, end, ticker in candidates:
+            if start >= last_end:
+                matches.append((start, end, ticker, text[start:end]))
+                last_end = end
+        return matches
+
+    def link(self, text):
+        """Distinct tickers mentioned in `text`, in order of first mention."""
+        return list(dict.fromkeys(m[2] for m in self.find(text)))
+
+    def link_many(self, texts):
+        return [self.link(t) for t in texts]
+
+    def link_series(self, texts):
+        """pandas Series of ticker lists, aligned with `texts`."""
+        import pandas as pd
+        return pd.Series(self.link_many(texts), index=texts.index)
@@ -0,0 +1,74 @@
+# a:\Infosys\scripts\export_finbert_onnx.py
+"""
+Exports the fine-tuned FinBERT checkpoints for CPU serving and checks that
+every backend stays within tolerance of the full-precision PyTorch model.
+
+Select the backend in test_model.py, 05_eval_fiqa.py and
+financial_entity_event_extractor.py with the FINBERT_BACKEND environment
+variable: pytorch (default), quantized, onnx or onnx-int8.
+"""
+import os
+import time
+import pandas as pd
+from inference_backends import (BACKENDS, load_model, checkpoint_task, export_onnx, compare_backends,
+                                predict_proba, token_proba)
+
+# === CONFIG ===
+DATA_PATH = r"A:\Infosys\data\processed\preprocessed_fiqa.csv"
+BASE_MODEL = "yiyanghkust/finbert-tone"
+# (model dir, tokenizer); each is exported for the task its checkpoint was trained for
+MODELS = [
+    (r"A:\Infosys\models\finbert_finetuned", BASE_MODEL),
+    (r"A:\Infosys\models\finbert_improved", BASE_MODEL),
+]
+N_CHECK = 256            # sentences used for the tolerance check
+TOLERANCE = {            # max abs probability difference vs PyTorch
+    "quantized": 0.05,
+    "onnx": 1e-4,
+    "onnx-int8": 0.05,
+}
+MIN_LABEL_AGREEMENT = 0.98
+
+
+def latency_ms(model, tokenizer, texts, task):
+    t0 = time.perf_counter()
+    (token_proba if task == "token" else predict_proba)(model, tokenizer, texts, batch_size=1)
+    return (time.perf_counter() - t0) * 1000 / len(texts)
+
+
+def main():
+    from transformers import AutoTokenizer   # deferred, like torch inside inference_backends
+    texts = pd.read_csv(DATA_PATH)['text'].astype(str).head(N_CHECK).tolist()
+    failed = False
+    for model_dir, tokenizer_name in MODELS:
+        if not os.path.isdir(model_dir):
+            print(f"[WARN] Model not found, skipping: {model_dir}")
+            continue
+        # the saved architecture decides the graph: a sequence checkpoint exported as a token
+        # classifier would only carry a head it was never trained for
+        task = checkpoint_task(model_dir)
+        if task is None:
+            print(f"[WARN] No sequence/token architecture in {model_dir}/config.json, skipping")
+            continue
+        print(f"\n🔹 Exporting {model_dir} ({task})")
+        tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+        for path in export_onnx(model_dir, tokenizer, task=task):
+            print(f"💾 {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+        reference = load_model(model_dir, task, "pytorch")
+        print(f"  pytorch    {latency_ms(reference, tokenizer, texts[:32], task):.2f} ms/sentence")
+        for backend in BACKENDS[1:]:
+            model = load_model(model_dir, task, backend)
+            check = compare_backends(reference, model, tokenizer, texts, task=task)
+            ok = check["max_abs_diff"] <= TOLERANCE[backend] and check["label_agreement"] >= MIN_LABEL_AGREEMENT
+            failed |= not ok
+            print(f"  {backend:<10} {latency_ms(model, tokenizer, texts[:32], task):.2f} ms/sentence | "
+                  f"max |Δp| {check['max_abs_diff']:.5f} | label agreement {check['label_agreement']:.3f} "
+                  f"{'✅' if ok else '❌ outside tolerance'}")
+    if failed:
+        raise SystemExit("❌ At least one backend is outside tolerance; keep FINBERT_BACKEND=pytorch for it.")
+    print("\n✅ Export complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,57 @@
 import os
-from transformers import AutoTokenizer, AutoModelForTokenClassification
-import torch
+from inference_backends import load_model, predict_token_labels
 
 # Set to local-only mode to prevent repo id errors
 os.environ["TRANSFORMERS_OFFLINE"] = "1"
 
 # Use your path (adjust for your environment)
 MODEL_PATH = r"A:\Infosys\models\finbert_improved"
+BACKEND = os.environ.get("FINBERT_BACKEND", "pytorch")  # pytorch | quantized | onnx | onnx-int8
+MAX_LENGTH = 512   # tokens per text (BERT's limit)
+
+# --- Tokenizer and model are loaded on first use, so importing this module is cheap ---
+_tokenizer = None
+_model = None
+
+
+def get_model():
+    """(tokenizer, model), loaded once."""
+    global _tokenizer, _model
+    if _model is None:
+        from transformers import AutoTokenizer
+        _tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH, local_files_only=True)
+        _model = load_model(MODEL_PATH, task="token", backend=BACKEND, local_files_only=True)
+    return _tokenizer, _model
 
-# Load the tokenizer and model
-tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH, local_files_only=True)
-model = AutoModelForTokenClassification.from_pretrained(MODEL_PATH, local_files_only=True)
 
 # Financial entity extraction function
+def extract_entities_batch(texts):
+    """[(token, label)] of non-'O' tokens for each text, one forward pass for all."""
+    tokenizer, model = get_model()
+    return [[(tok, lab) for tok, lab, _, _ in entities]
+            for entities in predict_token_labels(model, tokenizer, texts, max_length=MAX_LENGTH)]
+
+
 def extract_entities(text):
-    # Tokenize the input text
-    inputs = tokenizer(text, return_tensors="pt", truncation=True)
-    with torch.no_grad():
-        outputs = model(**inputs)
-        logits = outputs.logits
-        predictions = torch.argmax(logits, dim=2)
-    tokens = tokenizer.convert_ids_to_tokens(inputs["input_ids"][0])
-    pred_labels = [model.config.id2label[p.item()] for p in predictions[0]]
-    filtered = [(tok, lab) for tok, lab in zip(tokens, pred_labels) if lab != "O"]
-    return filtered
-
-# Example usage
-financial_text = "Apple Inc. reported Q3 revenue growth and an increase in market cap."
-extracted = extract_entities(financial_text)
-print("Financial Entities Extracted:")
-for token, label in extracted:
-    print(f"{token}: {label}")
-
-sample_texts = [
-    "Tesla stock price rose after quarterly earnings.",
-    "Alphabet saw a drop in market capitalization."
-]
-for txt in sample_texts:
-    print(f"\nEntities from: {txt}")
-    print(extract_entities(txt))
+    return extract_entities_batch([text])[0]
+
+
+def main():
+    # Example usage
+    financial_text = "Apple Inc. reported Q3 revenue growth and an increase in market cap."
+    extracted = extract_entities(financial_text)
+    print("Financial Entities Extracted:")
+    for token, label in extracted:
+        print(f"{token}: {label}")
+
+    sample_texts = [
+        "Tesla stock price rose after quarterly earnings.",
+        "Alphabet saw a drop in market capitalization."
+    ]
+    for txt, entities in zip(sample_texts, extract_entities_batch(sample_texts)):
+        print(f"\nEntities from: {txt}")
+        print(entities)
+
+
+if __name__ == "__main__":
+    main()
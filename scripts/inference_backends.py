@@ -0,0 +1,262 @@
+import os
+import time
+from types import SimpleNamespace
+import numpy as np
+
+# torch and transformers take seconds to import, so they are imported on
+# first use: CLIs answer --help at once and callers pay only for what they run.
+
+# "pytorch"   full-precision checkpoint (default)
+# "quantized" same checkpoint with nn.Linear layers dynamically quantized to int8
+# "onnx"      ONNX Runtime graph exported by export_finbert_onnx.py
+# "onnx-int8" ONNX Runtime graph with int8 weights
+BACKENDS = ("pytorch", "quantized", "onnx", "onnx-int8")
+ONNX_DIR = "onnx"   # <model_dir>/onnx/model.<task>.onnx and model.<task>.int8.onnx
+
+AUTO_MODELS = {
+    "sequence": "AutoModelForSequenceClassification",
+    "token": "AutoModelForTokenClassification",
+}
+
+
+def auto_model(task):
+    import transformers
+    return getattr(transformers, AUTO_MODELS[task])
+
+
+def checkpoint_task(model_dir):
+    """
+    "sequence" or "token" from the architectures saved in the checkpoint's
+    config.json, or None when they do not say.
+    """
+    import json
+    config_path = os.path.join(model_dir, "config.json")
+    if not os.path.exists(config_path):
+        return None
+    with open(config_path, "r", encoding="utf-8") as f:
+        architectures = json.load(f).get("architectures") or []
+    for task, class_name in AUTO_MODELS.items():
+        suffix = class_name.replace("AutoModel", "")
+        if any(a.endswith(suffix) for a in architectures):
+            return task
+    return None
+
+
+def onnx_path(model_dir, task="sequence", int8=False):
+    # the task is part of the name: a sequence graph returns (batch, labels) logits,
+    # a token graph (batch, sequence, labels), and neither can stand in for the other
+    if task not in AUTO_MODELS:
+        raise ValueError(f"Unknown task {task!r}, expected one of {tuple(AUTO_MODELS)}")
+    return os.path.join(model_dir, ONNX_DIR, f"model.{task}.int8.onnx" if int8 else f"model.{task}.onnx")
+
+
+def quantize_dynamic(model):
+    """int8 weights for every nn.Linear, activations quantized on the fly (CPU only)."""
+    import torch
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxModel:
+    """
+    ONNX Runtime session with the calling convention of a transformers model:
+    `model(**inputs).logits` and `model.config`, so existing scripts work as is.
+    """
+
+    def __init__(self, path, config, num_threads=None):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.config = config
+
+    def __call__(self, **inputs):
+        import torch
+        feed = {}
+        for name in self.input_names:
+            value = inputs[name]
+            if isinstance(value, torch.Tensor):
+                value = value.cpu().numpy()
+            feed[name] = np.asarray(value, dtype=np.int64)
+        logits = self.session.run(["logits"], feed)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+    def eval(self):
+        return self
+
+
+def load_model(model_dir, task="sequence", backend="pytorch", **kwargs):
+    """
+    Loads a fine-tuned checkpoint for CPU inference with the chosen backend.
+    `task` is "sequence" or "token"; extra kwargs go to from_pretrained.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if backend.startswith("onnx"):
+        int8 = backend == "onnx-int8"
+        path = onnx_path(model_dir, task, int8=int8)
+        if not os.path.exists(path):
+            exported = [t for t in AUTO_MODELS if os.path.exists(onnx_path(model_dir, t, int8=int8))]
+            hint = f" Only a {'/'.join(exported)} graph is exported there." if exported else ""
+            raise FileNotFoundError(f"{path} not found: no {task} graph for this model.{hint} "
+                                    f"Export it with task={task!r} in export_finbert_onnx.py.")
+        from transformers import AutoConfig
+        return OnnxModel(path, AutoConfig.from_pretrained(model_dir, **kwargs))
+    model = auto_model(task).from_pretrained(model_dir, **kwargs).eval()
+    if backend == "quantized":
+        model = quantize_dynamic(model)
+    return model
+
+
+def export_onnx(model_dir, tokenizer, task="sequence", opset=17, **kwargs):
+    """
+    Exports `model_dir` for `task` to <model_dir>/onnx/model.<task>.onnx plus
+    an int8 dynamically quantized copy. Returns both paths.
+    """
+    import torch
+    from onnxruntime.quantization import quantize_dynamic as ort_quantize_dynamic, QuantType
+
+    model = auto_model(task).from_pretrained(model_dir, **kwargs).eval()
+    sample = tokenizer(["Operating profit rose to EUR 13.1 mn ."], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch", 1: "sequence"} if task == "token" else {0: "batch"}
+
+    fp32_path = onnx_path(model_dir, task)
+    int8_path = onnx_path(model_dir, task, int8=True)
+    os.makedirs(os.path.dirname(fp32_path), exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            dynamo=False,  # TorchScript exporter: keeps dynamic batch/sequence axes intact
+        )
+    ort_quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return fp32_path, int8_path
+
+
+def predict_proba(model, tokenizer, texts, batch_size=32, max_length=128, batch_seconds=None):
+    """
+    Softmax probabilities for a sequence classifier, (n, num_labels) numpy
+    array in input order. Texts are batched in length order so each batch
+    pads to sequences of similar size, under torch.inference_mode.
+    If `batch_seconds` is a list, the wall time of every batch is appended.
+    """
+    import torch
+    texts = [str(t) for t in texts]
+    probs = np.zeros((len(texts), model.config.num_labels), dtype=np.float32)
+    order = np.argsort([len(t) for t in texts], kind="stable")
+    with torch.inference_mode():
+        for start in range(0, len(texts), batch_size):
+            t0 = time.perf_counter()
+            idx = order[start:start + batch_size]
+            inputs = tokenizer([texts[i] for i in idx], padding=True, truncation=True,
+                               max_length=max_length, return_tensors="pt")
+            logits = model(**inputs).logits
+            probs[idx] = torch.softmax(logits.float(), dim=-1).numpy()
+            if batch_seconds is not None:
+                batch_seconds.append(time.perf_counter() - t0)
+    return probs
+
+
+def predict_proba_tokenized(model, tokenizer, rows, batch_size=32, batch_seconds=None):
+    """
+    predict_proba for rows that are already tokenized, e.g. a selection from
+    token_cache.load_tokenized: a datasets.Dataset with unpadded input_ids,
+    attention_mask[, token_type_ids] (and optionally length) per row. Batches
+    are formed in length order and padded to their longest row; nothing is
+    re-tokenized.
+    """
+    import torch
+    columns = [c for c in ("input_ids", "attention_mask", "token_type_ids") if c in rows.column_names]
+    lengths = rows["length"] if "length" in rows.column_names else [len(ids) for ids in rows["input_ids"]]
+    probs = np.zeros((len(rows), model.config.num_labels), dtype=np.float32)
+    order = np.argsort(lengths, kind="stable")
+    with torch.inference_mode():
+        for start in range(0, len(rows), batch_size):
+            t0 = time.perf_counter()
+            idx = order[start:start + batch_size]
+            batch = rows.select(idx)
+            width = max(len(ids) for ids in batch["input_ids"])
+            inputs = {}
+            for c in columns:
+                pad_id = tokenizer.pad_token_id if c == "input_ids" else 0
+                if tokenizer.padding_side == "left":
+                    padded = [[pad_id] * (width - len(seq)) + seq for seq in batch[c]]
+                else:
+                    padded = [seq + [pad_id] * (width - len(seq)) for seq in batch[c]]
+                inputs[c] = torch.tensor(padded, dtype=torch.long)
+            logits = model(**inputs).logits
+            probs[idx] = torch.softmax(logits.float(), dim=-1).numpy()
+            if batch_seconds is not None:
+                batch_seconds.append(time.perf_counter() - t0)
+    return probs
+
+
+def predict_token_labels(model, tokenizer, texts, max_length=128):
+    """
+    Non-'O' token labels for a token classifier, one list per text of
+    (token, label, start, end); character offsets are None with slow tokenizers.
+    """
+    import torch
+    texts = [str(t) for t in texts]
+    if not texts:
+        return []
+    offsets = getattr(tokenizer, "is_fast", False)
+    inputs = tokenizer(texts, padding=True, truncation=True, max_length=max_length,
+                       return_tensors="pt", return_offsets_mapping=offsets)
+    offset_mapping = inputs.pop("offset_mapping", None)
+    with torch.inference_mode():
+        predictions = model(**inputs).logits.argmax(dim=-1)
+    id2label = model.config.id2label
+    results = []
+    for row in range(len(texts)):
+        tokens = tokenizer.convert_ids_to_tokens(inputs["input_ids"][row])
+        entities = []
+        for col, (token, pred) in enumerate(zip(tokens, predictions[row].tolist())):
+            label = id2label[pred]
+            if label == "O" or not inputs["attention_mask"][row][col]:
+                continue
+            start, end = offset_mapping[row][col].tolist() if offset_mapping is not None else (None, None)
+            entities.append((token, label, start, end))
+        results.append(entities)
+    return results
+
+
+def token_proba(model, tokenizer, texts, batch_size=32, max_length=128):
+    """
+    Softmax probabilities of a token classifier for every non-padding token,
+    (n_tokens, num_labels) numpy array, texts and tokens in input order.
+    """
+    import torch
+    texts = [str(t) for t in texts]
+    chunks = []
+    with torch.inference_mode():
+        for start in range(0, len(texts), batch_size):
+            inputs = tokenizer(texts[start:start + batch_size], padding=True, truncation=True,
+                               max_length=max_length, return_tensors="pt")
+            probs = torch.softmax(model(**inputs).logits.float(), dim=-1)
+            chunks.append(probs[inputs["attention_mask"].bool()].numpy())
+    return np.concatenate(chunks) if chunks else np.zeros((0, model.config.num_labels), dtype=np.float32)
+
+
+def compare_backends(reference, candidate, tokenizer, texts, batch_size=32, task="sequence"):
+    """
+    Max absolute probability difference and label agreement between two
+    models on the same texts, used to check a backend against PyTorch.
+    For task="token" both are per token rather than per text.
+    """
+    proba = token_proba if task == "token" else predict_proba
+    ref = proba(reference, tokenizer, texts, batch_size)
+    cand = proba(candidate, tokenizer, texts, batch_size)
+    return {
+        "max_abs_diff": float(np.abs(ref - cand).max()) if len(ref) else 0.0,
+        "label_agreement": float((ref.argmax(axis=1) == cand.argmax(axis=1)).mean()) if len(ref) else 1.0,
+    }
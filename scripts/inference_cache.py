@@ -0,0 +1,109 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import unicodedata
+
+# Bumped whenever the key derivation changes, so entries written under the
+# old scheme are never served (version 1 lowercased the text).
+KEY_VERSION = 2
+
+
+def normalize_text(text):
+    """NFC-normalize and collapse whitespace; case is kept (the models are case-sensitive)."""
+    return re.sub(r'\s+', ' ', unicodedata.normalize("NFC", str(text))).strip()
+
+
+class InferenceCache:
+    """
+    Content-addressed, on-disk cache of model outputs (SQLite).
+
+    Keys are a SHA-256 of the normalized text, the model name, the sorted
+    label set and KEY_VERSION, so changing the model, any label or the key
+    scheme invalidates old entries automatically. The table is kept below `max_entries` by evicting the
+    least recently used rows.
+    """
+
+    def __init__(self, path, model_name, labels, max_entries=500_000):
+        out_dir = os.path.dirname(path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._namespace = json.dumps([KEY_VERSION, model_name, sorted(labels)])
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON results(last_used)")
+        self._conn.commit()
+
+    def key(self, text):
+        payload = self._namespace + "\x00" + normalize_text(text)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts):
+        """Returns a list aligned with `texts`: cached value or None."""
+        keys = [self.key(t) for t in texts]
+        found = {}
+        unique = list(set(keys))
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = self._conn.execute(f"SELECT key, value FROM results WHERE key IN ({marks})", chunk)
+            found.update((k, json.loads(v)) for k, v in rows)
+        if found:
+            now = time.time()
+            self._conn.executemany("UPDATE results SET last_used = ? WHERE key = ?",
+                                   [(now, k) for k in found])
+            self._conn.commit()
+        values = [found.get(k) for k in keys]
+        hit_count = sum(v is not None for v in values)
+        self.hits += hit_count
+        self.misses += len(values) - hit_count
+        return values
+
+    def get(self, text):
+        return self.get_many([text])[0]
+
+    def put_many(self, texts, values):
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO results (key, value, last_used) VALUES (?, ?, ?)",
+            [(self.key(t), json.dumps(v), now) for t, v in zip(texts, values)]
+        )
+        self._conn.commit()
+        self._evict()
+
+    def put(self, text, value):
+        self.put_many([text], [value])
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY last_used ASC LIMIT ?)", (overflow,)
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self),
+        }
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,291 @@
+# a:\Infosys\scripts\inference_server.py
+"""
+Local inference service that keeps the FinBERT sentiment and NER models
+warm and serves them over HTTP (standard library only).
+
+    python inference_server.py --port 8080
+
+    POST /predict/sentiment  {"text": "..."} or {"texts": ["...", ...]}
+    POST /predict/entities   {"text": "..."} or {"texts": ["...", ...]}   (with --ner-model)
+    GET  /metrics            queue depth, batch sizes, latency percentiles
+    GET  /health
+
+Requests are handled on threads, but each model runs in one worker thread
+fed by a MicroBatcher. The batcher groups texts that arrive within
+--max-wait-ms of each other, up to --max-batch-size, into one forward
+pass. Under load, many small requests share a batch. When idle, a lone
+headline waits at most max-wait-ms before it runs.
+"""
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+from inference_backends import BACKENDS, load_model, checkpoint_task, predict_proba, predict_token_labels
+
+# === CONFIG (defaults for the command-line options) ===
+HOST = "127.0.0.1"
+PORT = 8080
+SENTIMENT_MODEL_DIR = r"A:\Infosys\models\finbert_finetuned"
+SENTIMENT_TOKENIZER = "yiyanghkust/finbert-tone"
+# No NER checkpoint is trained in this repo (models/finbert_improved is a sequence classifier),
+# so /predict/entities is off unless --ner-model names a token-classification checkpoint.
+NER_MODEL_DIR = ""
+BACKEND = os.environ.get("FINBERT_BACKEND", "pytorch")
+MAX_BATCH_SIZE = 32
+MAX_WAIT_MS = 5.0
+MAX_LENGTH = 128
+MAX_TEXTS_PER_REQUEST = 256
+REQUEST_TIMEOUT_S = 30.0   # a request waiting longer for its batch gets 504
+LATENCY_WINDOW = 10000   # recent requests kept for latency percentiles
+
+
+class MicroBatcher:
+    """
+    Coalesces single items submitted from many threads into batches for
+    `process_fn(items) -> results`. A batch closes when it holds
+    `max_batch_size` items, or `max_wait_ms` after its first item arrived.
+    """
+
+    def __init__(self, name, process_fn, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.name = name
+        self.process_fn = process_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)      # enqueue -> result, seconds
+        self.batch_times = deque(maxlen=LATENCY_WINDOW)    # forward pass, seconds
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self.items = self.batches = self.errors = 0
+        self.thread = threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True)
+        self.thread.start()
+
+    def submit(self, item):
+        future = Future()
+        self.queue.put((item, future, time.perf_counter()))
+        return future
+
+    def _next_batch(self):
+        batch = [self.queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            t0 = time.perf_counter()
+            try:
+                results = self.process_fn([item for item, _, _ in batch])
+                error = None
+            except Exception as e:
+                results, error = None, e
+            done = time.perf_counter()
+            for i, (_, future, enqueued) in enumerate(batch):
+                if error is None:
+                    future.set_result(results[i])
+                else:
+                    future.set_exception(error)
+            with self.lock:
+                self.items += len(batch)
+                self.batches += 1
+                self.errors += len(batch) if error is not None else 0
+                self.batch_times.append(done - t0)
+                self.batch_sizes.append(len(batch))
+                self.latencies.extend(done - enqueued for _, _, enqueued in batch)
+
+    def metrics(self):
+        with self.lock:
+            latencies = np.array(self.latencies) * 1000
+            batch_ms = np.array(self.batch_times) * 1000
+            sizes = np.array(self.batch_sizes)
+            items, batches, errors = self.items, self.batches, self.errors
+
+        def pct(values, q):
+            return round(float(np.percentile(values, q)), 2) if len(values) else None
+        return {
+            "queue_depth": self.queue.qsize(),
+            "items": items,
+            "batches": batches,
+            "errors": errors,
+            "mean_batch_size": round(float(sizes.mean()), 2) if len(sizes) else None,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "latency_ms_p50": pct(latencies, 50),
+            "latency_ms_p95": pct(latencies, 95),
+            "latency_ms_p99": pct(latencies, 99),
+            "batch_ms_p50": pct(batch_ms, 50),
+            "batch_ms_p95": pct(batch_ms, 95),
+        }
+
+
+def sentiment_batch_fn(model, tokenizer, max_length):
+    labels = [model.config.id2label[i] for i in range(model.config.num_labels)]
+
+    def process(texts):
+        probs = predict_proba(model, tokenizer, texts, batch_size=len(texts), max_length=max_length)
+        return [{"label": labels[int(p.argmax())], "scores": {l: round(float(v), 6) for l, v in zip(labels, p)}}
+                for p in probs]
+    return process
+
+
+def entity_batch_fn(model, tokenizer, max_length):
+    def process(texts):
+        return [[{"token": tok, "label": label, "start": start, "end": end} for tok, label, start, end in entities]
+                for entities in predict_token_labels(model, tokenizer, texts, max_length=max_length)]
+    return process
+
+
+class InferenceServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128   # listen backlog; the default of 5 resets connections under bursts
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    server_version = "FinBERTInference/1.0"
+    protocol_version = "HTTP/1.1"         # keep-alive: clients reuse connections
+    disable_nagle_algorithm = True        # small responses go out at once, no delayed-ACK stall
+
+    def log_message(self, fmt, *args):
+        pass   # per-request logging would dominate latency; see /metrics
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "models": sorted(self.server.batchers)})
+        elif self.path == "/metrics":
+            self._send(200, {
+                "uptime_seconds": round(time.time() - self.server.started, 1),
+                "backend": self.server.backend,
+                **{name: b.metrics() for name, b in self.server.batchers.items()},
+            })
+        else:
+            self._send(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        routes = {"/predict/sentiment": "sentiment", "/predict/entities": "entities"}
+        if self.path not in routes:
+            self._send(404, {"error": f"unknown path {self.path}"})
+            return
+        batcher = self.server.batchers.get(routes[self.path])
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            single = "text" in payload
+            texts = [payload["text"]] if single else payload["texts"]
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError("'texts' must be a list of strings")
+            if len(texts) > MAX_TEXTS_PER_REQUEST:
+                raise ValueError(f"at most {MAX_TEXTS_PER_REQUEST} texts per request")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {"error": f"expected {{\"text\": str}} or {{\"texts\": [str]}}: {e}"})
+            return
+        if batcher is None:
+            self._send(503, {"error": f"{routes[self.path]} model not loaded"})
+            return
+        futures = [batcher.submit(t) for t in texts]
+        deadline = time.perf_counter() + self.server.request_timeout
+        try:
+            results = [f.result(timeout=max(deadline - time.perf_counter(), 0)) for f in futures]
+        except FutureTimeout:
+            self._send(504, {"error": f"no result within {self.server.request_timeout:g}s"})
+            return
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._send(200, results[0] if single else {"results": results})
+
+
+def build_batchers(args):
+    from transformers import AutoTokenizer   # deferred: --help and bad arguments return at once
+    batchers = {}
+    print(f"🔹 Loading sentiment model {args.sentiment_model} ({args.backend} backend)...")
+    tokenizer = AutoTokenizer.from_pretrained(args.sentiment_tokenizer)
+    model = load_model(args.sentiment_model, backend=args.backend)
+    batchers["sentiment"] = MicroBatcher("sentiment", sentiment_batch_fn(model, tokenizer, args.max_length),
+                                         args.max_batch_size, args.max_wait_ms)
+    if not args.ner_model:
+        print("[WARN] No --ner-model given; /predict/entities will return 503")
+    elif checkpoint_task(args.ner_model) != "token":
+        # a sequence checkpoint would load with a randomly initialized token head
+        print(f"[WARN] {args.ner_model} is not a token-classification checkpoint; /predict/entities will return 503")
+    else:
+        print(f"🔹 Loading NER model {args.ner_model}...")
+        try:
+            ner_tokenizer = AutoTokenizer.from_pretrained(args.ner_model)
+            ner_model = load_model(args.ner_model, task="token", backend=args.backend)
+            batchers["entities"] = MicroBatcher("entities", entity_batch_fn(ner_model, ner_tokenizer, args.max_length),
+                                                args.max_batch_size, args.max_wait_ms)
+        except Exception as e:
+            print(f"[WARN] NER model failed to load ({type(e).__name__}: {e}); /predict/entities will return 503")
+
+    # warm-up: first forward passes allocate buffers and are much slower.
+    # The sentiment model must work; a failing NER model only disables its route.
+    for name, batcher in list(batchers.items()):
+        try:
+            for _ in range(3):
+                batcher.submit("Operating profit rose to EUR 13.1 mn from EUR 8.7 mn .").result(timeout=args.request_timeout)
+        except Exception as e:
+            if name == "sentiment":
+                raise
+            print(f"[WARN] {name} warm-up failed ({type(e).__name__}: {e}); its route will return 503")
+            del batchers[name]
+    return batchers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve FinBERT sentiment and NER predictions over HTTP.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--sentiment-model", default=SENTIMENT_MODEL_DIR)
+    parser.add_argument("--sentiment-tokenizer", default=SENTIMENT_TOKENIZER)
+    parser.add_argument("--ner-model", default=NER_MODEL_DIR, help="token-classification checkpoint (default: route disabled)")
+    parser.add_argument("--backend", default=BACKEND, choices=BACKENDS)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH)
+    parser.add_argument("--request-timeout", type=float, default=REQUEST_TIMEOUT_S,
+                        help="seconds a request waits for its results before 504")
+    parser.add_argument("--threads", type=int, help="torch intra-op threads")
+    args = parser.parse_args(argv)
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    server = InferenceServer((args.host, args.port), InferenceHandler)
+    server.batchers = build_batchers(args)
+    server.backend = args.backend
+    server.request_timeout = args.request_timeout
+    server.started = time.time()
+    print(f"✅ Serving on http://{args.host}:{server.server_port} "
+          f"(max batch {args.max_batch_size}, max wait {args.max_wait_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🔹 Shutting down")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+# a:\Infosys\scripts\ingest_reports.py
+"""
+Batch ingestion of a directory of filings (10-K/10-Q PDFs) through
+segmentation (05_segment_reports.py) and table parsing (06_parse_tables.py).
+
+    python ingest_reports.py A:\\Infosys\\filings\\2024Q4 --workers 8
+    python ingest_reports.py filings/ --force          # redo everything
+
+A manifest in the output directory records every ingested PDF under its
+SHA-256 content hash and PIPELINE_VERSION. On a re-run, a filing whose
+content already has a successful entry is skipped, whatever its path or
+name. New or changed files, files that failed before, and everything after
+a PIPELINE_VERSION bump are processed again. Files are hashed again only
+when their size or mtime changed.
+
+Each file runs in one task of a bounded process pool. Its stages run
+sequentially, because the pool already uses the cores. Workers return the
+section texts, and the parent process, as the only writer, appends them to
+the corpus segment store (segment_store.py) in doc_segments/. Per-file
+stage timings and errors go to the manifest and to ingest_report.csv, and
+a summary with the failures is printed at the end.
+"""
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import importlib
+import traceback
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import pandas as pd
+from segment_store import SegmentStore
+
+segment_reports = importlib.import_module("05_segment_reports")
+parse_tables = importlib.import_module("06_parse_tables")
+
+# === CONFIG (defaults for the command-line options) ===
+INPUT_DIR = r"A:\Infosys\sample_reports"
+OUTPUT_ROOT = r"A:\Infosys\outputs"
+NUM_WORKERS = os.cpu_count() or 1
+PIPELINE_VERSION = "1"          # bump when 05/06 change their output, to re-ingest everything
+MANIFEST_NAME = "ingest_manifest.json"
+REPORT_NAME = "ingest_report.csv"
+SAVE_EVERY = 20                 # manifest checkpoints (files), so an interrupted run keeps its progress
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def find_pdfs(input_dir):
+    paths = []
+    for root, _, files in os.walk(input_dir):
+        paths += [os.path.join(root, f) for f in files if f.lower().endswith(".pdf")]
+    return sorted(paths)
+
+
+def doc_id(input_dir, path):
+    """Stable per-file name for outputs: the path relative to input_dir, without extension."""
+    rel = os.path.splitext(os.path.relpath(path, input_dir))[0]
+    return rel.replace(os.sep, "__").replace("/", "__")
+
+
+def manifest_key(sha256):
+    return f"{PIPELINE_VERSION}:{sha256}"
+
+
+class Manifest:
+    """
+    {"files": {"<version>:<sha256>": entry}, "stat": {path: [size, mtime, sha256]}},
+    saved atomically as JSON.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files, self.stat = {}, {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.files, self.stat = data.get("files", {}), data.get("stat", {})
+
+    def sha256(self, path):
+        """Content hash, reused from the last run while the file's size and mtime are unchanged."""
+        st = os.stat(path)
+        cached = self.stat.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime:
+            return cached[2]
+        digest = file_sha256(path)
+        self.stat[path] = [st.st_size, st.st_mtime, digest]
+        return digest
+
+    def done_doc(self, sha256):
+        """Name of the document this content was ingested as under this PIPELINE_VERSION, else None."""
+        entry = self.files.get(manifest_key(sha256))
+        return entry["doc"] if entry is not None and entry["status"] == "ok" else None
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"pipeline_version": PIPELINE_VERSION, "files": self.files, "stat": self.stat}, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+def ingest_one(pdf_path, name, tables_dir):
+    """
+    Runs both stages on one PDF (in a worker process). Stage output is
+    captured instead of printed, so parallel files do not interleave.
+    Returns (manifest entry, section texts); exceptions are recorded in
+    the entry, not raised.
+    """
+    entry = {"path": pdf_path, "doc": name, "status": "ok", "error": None, "seconds": {}}
+    sections = None
+    log = io.StringIO()
+    stage = None
+    t_start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log):
+            stage = "segments"
+            t0 = time.perf_counter()
+            sections = segment_reports.section_texts(pdf_path, num_workers=1)
+            entry["sections"] = len(sections)
+            entry["seconds"]["segments"] = round(time.perf_counter() - t0, 3)
+
+            stage = "tables"
+            t0 = time.perf_counter()
+            doc_tables_dir = os.path.join(tables_dir, name)
+            shutil.rmtree(doc_tables_dir, ignore_errors=True)   # no stale CSVs from an older version
+            index_df = parse_tables.extract_tables(pdf_path, doc_tables_dir, num_workers=1)
+            entry["tables"] = len(index_df)
+            entry["tables_index"] = os.path.join(doc_tables_dir, "tables_index.csv")
+            entry["seconds"]["tables"] = round(time.perf_counter() - t0, 3)
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = f"{stage}: {type(e).__name__}: {e}"
+        entry["traceback"] = traceback.format_exc(limit=5)
+    entry["seconds"]["total"] = round(time.perf_counter() - t_start, 3)
+    entry["ingested_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    return entry, sections
+
+
+def store_sections(store, entry, sections, segments_dir):
+    """Appends a finished file's sections to the segment store (parent process only)."""
+    if entry["status"] != "ok":
+        return
+    t0 = time.perf_counter()
+    try:
+        segment_reports.write_segments(store, entry["doc"], entry["path"], sections, segments_dir)
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = f"store: {type(e).__name__}: {e}"
+    entry["seconds"]["store"] = round(time.perf_counter() - t0, 3)
+
+
+def run_pool(tasks, num_workers):
+    """Yields (sha256, (entry, sections)) as tasks finish, with at most 2 x num_workers tasks in flight."""
+    if num_workers <= 1:
+        for sha256, args in tasks:
+            yield sha256, ingest_one(*args)
+        return
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        pending = {}
+        tasks = iter(tasks)
+        while True:
+            while len(pending) < 2 * num_workers:
+                task = next(tasks, None)
+                if task is None:
+                    break
+                pending[pool.submit(ingest_one, *task[1])] = task[0]
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Segment and parse tables for a directory of PDF filings.")
+    parser.add_argument("input_dir", nargs="?", default=INPUT_DIR, help="directory searched recursively for .pdf files")
+    parser.add_argument("--out-dir", default=OUTPUT_ROOT, help="gets doc_segments/ (segment store), tables/<doc>/ and the manifest")
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS)
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and process every file")
+    args = parser.parse_args(argv)
+
+    segments_dir = os.path.join(args.out_dir, "doc_segments")
+    tables_dir = os.path.join(args.out_dir, "tables")
+    manifest = Manifest(os.path.join(args.out_dir, MANIFEST_NAME))
+
+    t0 = time.perf_counter()
+    pdfs = find_pdfs(args.input_dir)
+    tasks, skipped, duplicates, seen = [], 0, 0, {}
+    for path in pdfs:
+        sha256 = manifest.sha256(path)
+        name = doc_id(args.input_dir, path)
+        # a byte-identical copy of a filing (same content, other name) is a duplicate, not new work
+        done_as = seen.get(sha256) or (None if args.force else manifest.done_doc(sha256))
+        if done_as is not None:
+            skipped += 1
+            duplicates += done_as != name
+            continue
+        seen[sha256] = name
+        tasks.append((sha256, (path, name, tables_dir)))
+    print(f"🔹 {len(pdfs)} PDFs under {args.input_dir}: {len(tasks)} to ingest, {skipped} unchanged "
+          f"({duplicates} duplicates of other filings), pipeline v{PIPELINE_VERSION}, "
+          f"hashed in {time.perf_counter() - t0:.1f}s")
+
+    os.makedirs(segments_dir, exist_ok=True)
+    store = SegmentStore(segments_dir)
+    results = []
+    for n, (sha256, (entry, sections)) in enumerate(run_pool(tasks, args.workers), 1):
+        store_sections(store, entry, sections, segments_dir)
+        manifest.files[manifest_key(sha256)] = {**entry, "sha256": sha256, "pipeline_version": PIPELINE_VERSION}
+        results.append({"sha256": sha256, **{k: v for k, v in entry.items() if k not in ("seconds", "traceback")},
+                        **{f"seconds_{k}": v for k, v in entry["seconds"].items()}})
+        status = "✅" if entry["status"] == "ok" else "❌"
+        detail = entry["error"] if entry["error"] else \
+            f"{entry['sections']} sections, {entry['tables']} tables"
+        print(f"{status} [{n}/{len(tasks)}] {entry['doc']} in {entry['seconds']['total']:.2f}s: {detail}")
+        if n % SAVE_EVERY == 0:
+            manifest.save()
+    manifest.save()
+
+    elapsed = time.perf_counter() - t0
+    failed = [r for r in results if r["status"] != "ok"]
+    if results:
+        report_path = os.path.join(args.out_dir, REPORT_NAME)
+        pd.DataFrame(results).to_csv(report_path, index=False)
+        print(f"💾 Per-file report: {report_path}")
+    print(f"⏱️ Ingested {len(results) - len(failed)} files, {len(failed)} failed, {skipped} skipped "
+          f"in {elapsed:.1f}s ({len(results) / max(elapsed, 1e-9):.2f} files/s)")
+    for r in failed:
+        print(f"   [WARN] {r['path']}: {r['error']}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import os
+import json
+import hashlib
+import torch
+import torch.nn.functional as F
+from transformers import AutoTokenizer, AutoModel
+
+
+class LabelEmbeddingClassifier:
+    """
+    Bi-encoder event classifier: labels and sentences are embedded separately
+    (mean-pooled, L2-normalized) and each sentence takes the label with the
+    highest cosine similarity. One forward pass per sentence instead of one
+    per sentence x label pair as in the zero-shot NLI pipeline.
+
+    Label embeddings are computed once and, when `cache_path` is given,
+    stored on disk together with a key of model name, labels and template.
+    """
+
+    def __init__(self, model_name, labels, threshold=0.35, batch_size=128,
+                 max_length=128, label_template="{}", cache_path=None):
+        self.model_name = model_name
+        self.labels = list(labels)
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name).eval()
+        self.label_embeddings = self._load_label_embeddings(label_template, cache_path)
+
+    def _load_label_embeddings(self, label_template, cache_path):
+        key = hashlib.sha256(json.dumps([self.model_name, self.labels, label_template]).encode("utf-8")).hexdigest()
+        if cache_path and os.path.exists(cache_path):
+            stored = torch.load(cache_path)
+            if stored.get("key") == key:
+                return stored["embeddings"]
+        embeddings = self.embed([label_template.format(label) for label in self.labels])
+        if cache_path:
+            out_dir = os.path.dirname(cache_path)
+            if out_dir:
+                os.makedirs(out_dir, exist_ok=True)
+            torch.save({"key": key, "embeddings": embeddings}, cache_path)
+        return embeddings
+
+    @torch.inference_mode()
+    def embed(self, texts):
+        """(n, hidden) tensor of unit-length sentence embeddings, in input order."""
+        texts = list(texts)
+        if not texts:
+            return torch.empty(0, self.model.config.hidden_size)
+        # length-sorted batches keep per-batch padding small
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        chunks = []
+        for start in range(0, len(order), self.batch_size):
+            batch = [texts[i] for i in order[start:start + self.batch_size]]
+            enc = self.tokenizer(batch, padding=True, truncation=True,
+                                 max_length=self.max_length, return_tensors="pt")
+            hidden = self.model(**enc).last_hidden_state
+            mask = enc["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            chunks.append(F.normalize(pooled, dim=-1))
+        sorted_embs = torch.cat(chunks)
+        embeddings = torch.empty_like(sorted_embs)
+        embeddings[torch.tensor(order)] = sorted_embs
+        return embeddings
+
+    def scores(self, texts):
+        """(n, n_labels) cosine similarities."""
+        return self.embed(texts) @ self.label_embeddings.T
+
+    def predict(self, texts):
+        """Best label per text, or None when its similarity is below the threshold."""
+        best_scores, best_idx = self.scores(texts).max(dim=1)
+        return [self.labels[i] if s > self.threshold else None
+                for s, i in zip(best_scores.tolist(), best_idx.tolist())]
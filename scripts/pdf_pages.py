@@ -0,0 +1,67 @@
+# a:\Infosys\scripts\pdf_pages.py
+"""
+Page-level text extraction for PDF reports, done in one pass.
+
+Each page is visited once. One PyMuPDF TextPage serves both the plain text
+and the span dictionary, and the result is kept as a compact PageText. The
+raw span dicts are dropped right away. Heading detection, regex anchoring
+and segment writing in 05_segment_reports.py all read from this one
+extraction instead of parsing every page again.
+
+With num_workers > 1 the document is split into contiguous page ranges.
+Each worker process opens its own handle on the PDF and reads one range
+at a time, and the ranges are concatenated in page order, so the result
+is identical to a sequential read.
+"""
+from collections import namedtuple
+import fitz  # PyMuPDF
+from sharded_runner import split_range, map_ranges
+
+MIN_PAGES_PER_RANGE = 16   # smaller documents are not worth a process pool
+
+# text:   page.get_text() output
+# blocks: [(average font size, text)] for every text block, in reading order
+PageText = namedtuple("PageText", ["index", "text", "blocks"])
+
+
+def read_page(page):
+    textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)   # no image data: text and spans only
+    text = page.get_text("text", textpage=textpage)
+    blocks = []
+    for b in page.get_text("dict", textpage=textpage)["blocks"]:
+        if "lines" not in b:
+            continue
+        sizes = []
+        text_buf = []
+        for l in b["lines"]:
+            for s in l["spans"]:
+                sizes.append(s["size"])
+                text_buf.append(s["text"])
+        if sizes:
+            blocks.append((sum(sizes) / len(sizes), " ".join(text_buf).strip()))
+    return PageText(page.number, text, blocks)
+
+
+def read_page_range(pdf_path, start, stop):
+    """[PageText] for pages [start, stop), from a document handle of its own."""
+    with fitz.open(pdf_path) as doc:
+        return [read_page(doc[i]) for i in range(start, stop)]
+
+
+def read_pages(pdf_path, num_workers=1):
+    """[PageText] for every page of the PDF, in page order."""
+    with fitz.open(pdf_path) as doc:
+        if num_workers <= 1 or len(doc) < 2 * MIN_PAGES_PER_RANGE:
+            return [read_page(page) for page in doc]
+        n_pages = len(doc)
+    ranges = split_range(n_pages, num_workers, min_size=MIN_PAGES_PER_RANGE)
+    return [page for chunk in map_ranges(read_page_range, ranges, num_workers, pdf_path) for page in chunk]
+
+
+def page_offsets(pages):
+    """Start offset of every page in "".join(p.text for p in pages)."""
+    offsets, acc = [], 0
+    for p in pages:
+        offsets.append(acc)
+        acc += len(p.text)
+    return offsets
@@ -0,0 +1,168 @@
+# a:\Infosys\scripts\price_store.py
+"""
+Local daily price store and event-window returns, so events can be checked
+against market moves without network calls.
+
+Layout: <root>/<TICKER>/<column>.npy, one NumPy array per column, with
+'date' stored as datetime64[D] and sorted ascending. Arrays are opened
+with mmap_mode='r', so only the pages that are actually read get loaded,
+and several processes can share them.
+
+Import CSVs (e.g. a yfinance download or a vendor export) with:
+    python price_store.py <store dir> prices.csv [more.csv ...] [--ticker AAPL]
+"""
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+COLUMNS = ("open", "high", "low", "close", "adj_close", "volume")
+# (start, end) trading-day offsets around the event day t: return = price[t+end] / price[t+start] - 1
+EVENT_WINDOWS = ((-1, 0), (-1, 1), (-1, 5))
+
+
+def to_days(values):
+    """datetime64[D] array from dates, timestamps or date strings (local calendar day, NaT if unparseable)."""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        if values.dt.tz is not None:
+            values = values.dt.tz_localize(None)
+    else:
+        # keep the calendar date as written, e.g. '2024-03-08 00:00:00-05:00' -> 2024-03-08
+        values = pd.to_datetime(values.astype(str).str[:10], errors="coerce")
+    return values.to_numpy().astype("datetime64[D]")
+
+
+def window_name(window):
+    return f"ret_{window[0]:+d}_{window[1]:+d}"
+
+
+class PriceStore:
+    def __init__(self, root):
+        self.root = root
+        self._arrays = {}
+
+    def _path(self, ticker, column):
+        return os.path.join(self.root, ticker.upper(), f"{column}.npy")
+
+    def tickers(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(t for t in os.listdir(self.root) if os.path.exists(self._path(t, "date")))
+
+    def has(self, ticker):
+        return os.path.exists(self._path(ticker, "date"))
+
+    def columns(self, ticker):
+        return [c for c in COLUMNS if os.path.exists(self._path(ticker, c))]
+
+    def load(self, ticker, column):
+        """Memory-mapped column of one ticker (read-only)."""
+        key = (ticker.upper(), column)
+        if key not in self._arrays:
+            self._arrays[key] = np.load(self._path(ticker, column), mmap_mode="r")
+        return self._arrays[key]
+
+    def history(self, ticker):
+        frame = pd.DataFrame({c: self.load(ticker, c) for c in self.columns(ticker)})
+        frame.insert(0, "date", self.load(ticker, "date"))
+        return frame
+
+    def write(self, ticker, frame):
+        """
+        Merges `frame` (a date column plus any of COLUMNS) into the ticker's
+        history; on duplicate dates the new rows win.
+        """
+        ticker = ticker.upper()
+        frame = frame.copy()
+        frame["date"] = to_days(frame["date"].to_numpy())
+        frame = frame.dropna(subset=["date"])
+        if self.has(ticker):
+            frame = pd.concat([self.history(ticker), frame], ignore_index=True)
+        frame = frame.drop_duplicates("date", keep="last").sort_values("date")
+
+        os.makedirs(os.path.join(self.root, ticker), exist_ok=True)
+        arrays = {"date": to_days(frame["date"].to_numpy())}
+        for column in COLUMNS:
+            if column in frame:
+                arrays[column] = frame[column].to_numpy(dtype=np.float64)
+        for column, values in arrays.items():
+            self._arrays.pop((ticker, column), None)
+            path = self._path(ticker, column)
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, values)
+            os.replace(path + ".tmp", path)
+        return len(frame)
+
+    def import_csv(self, path, ticker=None):
+        """
+        Imports daily bars from a CSV with a date column, price columns
+        (Open/High/Low/Close/Adj Close/Volume, any case) and either a ticker
+        column or the `ticker` argument (default: the file name).
+        Returns {ticker: rows stored}.
+        """
+        frame = pd.read_csv(path)
+        frame.columns = [str(c).strip().lower().replace(" ", "_") for c in frame.columns]
+        if "date" not in frame:
+            raise ValueError(f"{path}: no date column")
+        if "ticker" in frame and ticker is None:
+            groups = frame.groupby(frame["ticker"].astype(str).str.upper())
+        else:
+            groups = [(ticker or os.path.splitext(os.path.basename(path))[0], frame)]
+        return {t: self.write(t, g[["date"] + [c for c in COLUMNS if c in g]]) for t, g in groups}
+
+    def event_window_returns(self, tickers, dates, windows=EVENT_WINDOWS, price="close"):
+        """
+        Returns around many events at once. Event day t is the first trading
+        day on or after the event date. For every (start, end) window the
+        return is price[t+end] / price[t+start] - 1. Events whose window
+        falls outside the stored history, or whose ticker is not in the
+        store, get NaN.
+
+        Events are grouped by ticker and located with one searchsorted call
+        per ticker, so thousands of events take milliseconds. The result
+        has one row per event, in input order.
+        """
+        tickers = pd.Series(tickers).astype(str).str.upper().to_numpy()
+        dates = to_days(dates)
+        n = len(tickers)
+        out = {window_name(w): np.full(n, np.nan) for w in windows}
+        trading_day = np.full(n, np.datetime64("NaT"), dtype="datetime64[D]")
+
+        codes, uniques = pd.factorize(tickers)
+        for code, ticker in enumerate(uniques):
+            if not self.has(ticker):
+                continue
+            rows = np.flatnonzero((codes == code) & ~np.isnat(dates))
+            history_dates = self.load(ticker, "date")
+            prices = self.load(ticker, price if os.path.exists(self._path(ticker, price)) else "close")
+            t = np.searchsorted(history_dates, dates[rows], side="left")
+            in_range = t < len(history_dates)
+            trading_day[rows[in_range]] = history_dates[t[in_range]]
+            for window in windows:
+                a, b = t + window[0], t + window[1]
+                ok = in_range & (a >= 0) & (b >= 0) & (a < len(prices)) & (b < len(prices))
+                values = np.full(len(rows), np.nan)
+                values[ok] = prices[b[ok]] / prices[a[ok]] - 1
+                out[window_name(window)][rows] = values
+        result = pd.DataFrame(out)
+        result.insert(0, "event_trading_date", trading_day)
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import daily price CSVs into a local price store.")
+    parser.add_argument("store", help="price store directory")
+    parser.add_argument("csv", nargs="+", help="CSV files with date + OHLCV columns")
+    parser.add_argument("--ticker", help="ticker for files without a ticker column (default: file name)")
+    args = parser.parse_args()
+
+    store = PriceStore(args.store)
+    for path in args.csv:
+        for ticker, rows in store.import_csv(path, args.ticker).items():
+            print(f"💾 {ticker}: {rows} days")
+    print(f"✅ Price store at {args.store} holds {len(store.tickers())} tickers")
+
+
+if __name__ == "__main__":
+    main()
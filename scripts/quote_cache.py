@@ -0,0 +1,201 @@
+import os
+import json
+import time
+
+QUOTE_FIELDS = ("current_price", "previous_close", "market_cap")
+
+
+def empty_quote():
+    return dict.fromkeys(QUOTE_FIELDS)
+
+
+def change_percent(quote):
+    current, prev = quote.get("current_price"), quote.get("previous_close")
+    if current and prev:
+        return round(((current - prev) / prev) * 100, 2)
+    return None
+
+
+# --- providers: fetch(ticker) -> {field: value}, raise on failure ---
+class YFinanceProvider:
+    name = "yfinance"
+
+    def fetch(self, ticker):
+        import yfinance as yf
+        info = yf.Ticker(ticker).info
+        return {
+            "current_price": info.get("currentPrice") or info.get("regularMarketPrice"),
+            "previous_close": info.get("previousClose"),
+            "market_cap": info.get("marketCap"),
+        }
+
+
+class FixtureProvider:
+    """
+    Quotes from a local file, for tests and offline runs.
+    CSV: ticker,current_price,previous_close,market_cap
+    JSON: {"AAPL": {"current_price": ..., "previous_close": ..., "market_cap": ...}, ...}
+    """
+    name = "fixture"
+
+    def __init__(self, path):
+        if path.lower().endswith(".json"):
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        else:
+            import pandas as pd
+            raw = pd.read_csv(path).set_index("ticker").to_dict(orient="index")
+        self.quotes = {str(t).upper(): {k: _clean(q.get(k)) for k in QUOTE_FIELDS} for t, q in raw.items()}
+
+    def fetch(self, ticker):
+        if ticker.upper() not in self.quotes:
+            raise KeyError(f"{ticker} not in fixture")
+        return dict(self.quotes[ticker.upper()])
+
+
+class HttpProvider:
+    """
+    Quotes from a JSON HTTP endpoint, GET <base_url>/<TICKER> ->
+    {"current_price": ..., "previous_close": ..., "market_cap": ...}
+    (e.g. an internal quote service, or a local stub server in tests).
+    """
+    name = "http"
+
+    def __init__(self, base_url, timeout=10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def fetch(self, ticker):
+        import urllib.request
+        import urllib.error
+        from urllib.parse import quote
+        try:
+            with urllib.request.urlopen(f"{self.base_url}/{quote(ticker.upper())}", timeout=self.timeout) as resp:
+                data = json.load(resp)
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                raise KeyError(f"{ticker} not found") from e
+            raise
+        return {k: data.get(k) for k in QUOTE_FIELDS}
+
+
+class PriceStoreProvider:
+    """Latest two closes from the local price store (price_store.py): no network calls."""
+    name = "price_store"
+
+    def __init__(self, root):
+        from price_store import PriceStore
+        self.store = PriceStore(root)
+
+    def fetch(self, ticker):
+        if not self.store.has(ticker):
+            raise KeyError(f"{ticker} not in price store")
+        close = self.store.load(ticker, "close")
+        return {
+            "current_price": float(close[-1]),
+            "previous_close": float(close[-2]) if len(close) > 1 else None,
+            "market_cap": None,
+        }
+
+
+def _clean(value):
+    # NaN from empty CSV cells -> None
+    return None if value is None or value != value else value
+
+
+def make_provider(name, fixture_path=None, url=None, store_dir=None, timeout=10.0):
+    if name == "yfinance":
+        return YFinanceProvider()
+    if name == "fixture":
+        return FixtureProvider(fixture_path)
+    if name == "http":
+        return HttpProvider(url, timeout)
+    if name == "price_store":
+        return PriceStoreProvider(store_dir)
+    raise ValueError(f"Unknown quote provider {name!r}, expected 'yfinance', 'fixture', 'http' or 'price_store'")
+
+
+class QuoteCache:
+    """
+    Per-ticker quotes, cached in memory and (optionally) in a JSON file on
+    disk for `ttl_seconds`. get_many() dedupes tickers and only calls the
+    provider for those without a fresh entry, so a batch of events costs one
+    fetch per distinct ticker. Failed fetches return empty quotes and are
+    not cached.
+
+    Without a `fetcher` missing tickers are fetched one by one; pass a
+    quote_fetcher.ConcurrentFetcher to fetch them concurrently with rate
+    limiting and retries.
+    """
+
+    def __init__(self, provider, cache_path=None, ttl_seconds=900, fetcher=None):
+        self.provider = provider
+        self.fetcher = fetcher
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.entries = {}   # "provider:TICKER" -> {"fetched_at": epoch seconds, "quote": {...}}
+        self.hits = self.misses = self.errors = 0
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def _key(self, ticker):
+        return f"{self.provider.name}:{ticker.upper()}"
+
+    def _fresh(self, ticker, now):
+        entry = self.entries.get(self._key(ticker))
+        if entry and now - entry["fetched_at"] < self.ttl_seconds:
+            return entry["quote"]
+        return None
+
+    def fetch_missing(self, tickers):
+        """{ticker: quote or None}; None marks a failed fetch."""
+        if self.fetcher is not None:
+            return self.fetcher.fetch_many(self.provider, tickers)
+        results = {}
+        for ticker in tickers:
+            try:
+                results[ticker] = self.provider.fetch(ticker)
+            except Exception:
+                results[ticker] = None
+        return results
+
+    def get_many(self, tickers):
+        """{ticker: quote} for every distinct ticker, fetching only stale or missing ones."""
+        now = time.time()
+        unique = list(dict.fromkeys(t for t in tickers if t))
+        quotes, missing = {}, []
+        for ticker in unique:
+            quote = self._fresh(ticker, now)
+            if quote is not None:
+                quotes[ticker] = quote
+            else:
+                missing.append(ticker)
+        self.hits += len(quotes)
+        self.misses += len(missing)
+
+        if missing:
+            for ticker, quote in self.fetch_missing(missing).items():
+                if quote is None:
+                    self.errors += 1
+                    quotes[ticker] = empty_quote()
+                else:
+                    self.entries[self._key(ticker)] = {"fetched_at": time.time(), "quote": quote}
+                    quotes[ticker] = quote
+            self.save()
+        return quotes
+
+    def get(self, ticker):
+        return self.get_many([ticker])[ticker]
+
+    def save(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors, "entries": len(self.entries)}
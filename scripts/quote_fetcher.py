@@ -0,0 +1,139 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests/sec on average, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ConcurrentFetcher:
+    """
+    Fetches quotes for many tickers with a thread pool of `max_workers`,
+    at most `rate_per_sec` provider calls per second (token bucket; None =
+    unlimited), `timeout` seconds per call and up to `retries` retries with
+    exponential backoff plus jitter. Plugs into QuoteCache(fetcher=...).
+
+    Each provider call runs on a daemon thread of its own. A call that
+    overruns `timeout` is abandoned: it finishes (or hangs) in the background
+    without holding a worker, so hung calls cannot starve the next ones.
+    Providers that support it should also time out the request itself
+    (HttpProvider(timeout=...)).
+
+    Every ticker gets a stats record (attempts, seconds, error), summarized
+    by summary().
+    """
+
+    def __init__(self, max_workers=8, rate_per_sec=None, timeout=10.0, retries=3, backoff=0.5):
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate_per_sec) if rate_per_sec else None
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.records = []
+        self.wall_seconds = 0.0
+        self.abandoned = 0      # calls that overran `timeout`
+        self.abandoned_running = 0
+        self._lock = threading.Lock()
+
+    def _call(self, provider, ticker):
+        """provider.fetch(ticker), waiting at most `timeout` seconds; raises TimeoutError after that."""
+        done = threading.Event()
+        box = {}
+
+        def run():
+            try:
+                box["quote"] = provider.fetch(ticker)
+            except BaseException as e:
+                box["error"] = e
+            finally:
+                with self._lock:
+                    done.set()
+                    if box.get("abandoned"):
+                        self.abandoned_running -= 1
+
+        threading.Thread(target=run, name=f"quote-call-{ticker}", daemon=True).start()
+        if not done.wait(self.timeout):
+            with self._lock:
+                if not done.is_set():
+                    box["abandoned"] = True
+                    self.abandoned += 1
+                    self.abandoned_running += 1
+                    raise TimeoutError(f"timeout after {self.timeout}s")
+        if "error" in box:
+            raise box["error"]
+        return box["quote"]
+
+    def _fetch_one(self, provider, ticker):
+        t0 = time.perf_counter()
+        error = None
+        for attempt in range(1, self.retries + 2):
+            if self.bucket is not None:
+                self.bucket.acquire()
+            try:
+                quote = self._call(provider, ticker)
+                return quote, {"ticker": ticker, "attempts": attempt, "seconds": time.perf_counter() - t0, "error": None}
+            except TimeoutError:
+                error = f"timeout after {self.timeout}s"
+            except KeyError as e:
+                # unknown ticker: retrying will not help
+                error = f"KeyError: {e}"
+                break
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            if attempt <= self.retries:
+                time.sleep(self.backoff * 2 ** (attempt - 1) * (1 + random.random()))
+        return None, {"ticker": ticker, "attempts": attempt, "seconds": time.perf_counter() - t0, "error": error}
+
+    def fetch_many(self, provider, tickers):
+        """{ticker: quote or None} for every ticker (None = failed after retries)."""
+        t0 = time.perf_counter()
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="quote-fetch") as pool:
+            futures = {ticker: pool.submit(self._fetch_one, provider, ticker) for ticker in tickers}
+            for ticker, future in futures.items():
+                quote, record = future.result()
+                results[ticker] = quote
+                self.records.append(record)
+        self.wall_seconds += time.perf_counter() - t0
+        return results
+
+    def summary(self):
+        if not self.records:
+            return {"requests": 0}
+        seconds = np.array([r["seconds"] for r in self.records])
+        failed = [r for r in self.records if r["error"]]
+        return {
+            "requests": len(self.records),
+            "failed": len(failed),
+            "retries": sum(r["attempts"] - 1 for r in self.records),
+            "latency_ms_p50": round(float(np.percentile(seconds, 50)) * 1000, 1),
+            "latency_ms_p95": round(float(np.percentile(seconds, 95)) * 1000, 1),
+            "latency_ms_max": round(float(seconds.max()) * 1000, 1),
+            "wall_seconds": round(self.wall_seconds, 2),
+            "requests_per_sec": round(len(self.records) / max(self.wall_seconds, 1e-9), 1),
+            "abandoned_calls": self.abandoned,
+            "abandoned_still_running": self.abandoned_running,
+            "errors": {r["ticker"]: r["error"] for r in failed[:20]},
+        }
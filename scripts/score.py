@@ -0,0 +1,150 @@
+# a:\Infosys\scripts\score.py
+"""
+Batch sentiment scoring with the fine-tuned FinBERT, e.g. for daily news dumps.
+
+    python score.py news.txt -o scores.csv
+    cat headlines.txt | python score.py - --format jsonl > scores.jsonl
+    python score.py news.csv --text-column headline --backend onnx-int8 -o scores.jsonl
+
+Input is a text file (one sentence per line), a .jsonl file with a "text"
+field, or a .csv file; '-' reads lines from stdin. The model is loaded once.
+Input is read in chunks, each chunk is scored in length-sorted batches
+under torch.inference_mode, and rows are written in input order as soon as
+their chunk is done. A throughput and batch-latency summary goes to stderr.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import numpy as np
+from inference_backends import BACKENDS, load_model, predict_proba
+
+# === CONFIG (defaults for the command-line options) ===
+MODEL_DIR = r"A:\Infosys\models\finbert_finetuned"
+BASE_MODEL = "yiyanghkust/finbert-tone"
+BACKEND = os.environ.get("FINBERT_BACKEND", "pytorch")
+BATCH_SIZE = 32
+MAX_LENGTH = 128
+CHUNK_SIZE = 2048   # sentences read, scored and written at a time
+
+
+def read_chunks(path, chunk_size, text_column="text"):
+    """Yields lists of texts from a txt/jsonl/csv file or stdin ('-')."""
+    if path != "-" and path.lower().endswith(".csv"):
+        import pandas as pd
+        for frame in pd.read_csv(path, usecols=[text_column], chunksize=chunk_size):
+            yield frame[text_column].fillna("").astype(str).tolist()
+        return
+    is_jsonl = path != "-" and path.lower().endswith(".jsonl")
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        chunk = []
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            chunk.append(json.loads(line)[text_column] if is_jsonl else line)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class ScoreWriter:
+    """Writes id, text (optional), label and one probability column per label as CSV or JSONL."""
+
+    def __init__(self, stream, fmt, labels, include_text):
+        self.stream = stream
+        self.fmt = fmt
+        self.labels = labels
+        self.include_text = include_text
+        self.fields = ["id"] + (["text"] if include_text else []) + ["label"] + [f"prob_{l}" for l in labels]
+        if fmt == "csv":
+            self.writer = csv.writer(stream, lineterminator="\n")
+            self.writer.writerow(self.fields)
+
+    def write(self, first_id, texts, probs):
+        top = probs.argmax(axis=1)
+        for i, (text, row) in enumerate(zip(texts, probs)):
+            values = [first_id + i] + ([text] if self.include_text else []) + [self.labels[top[i]]]
+            values += [round(float(p), 6) for p in row]
+            if self.fmt == "csv":
+                self.writer.writerow(values)
+            else:
+                self.stream.write(json.dumps(dict(zip(self.fields, values)), ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+def summarize(n_texts, elapsed, batch_seconds, batch_size):
+    ms = np.array(batch_seconds) * 1000 if batch_seconds else np.zeros(1)
+    return {
+        "texts": n_texts,
+        "seconds": round(elapsed, 2),
+        "texts_per_sec": round(n_texts / max(elapsed, 1e-9), 1),
+        "batches": len(batch_seconds),
+        "batch_size": batch_size,
+        "batch_latency_ms_p50": round(float(np.percentile(ms, 50)), 2),
+        "batch_latency_ms_p95": round(float(np.percentile(ms, 95)), 2),
+        "batch_latency_ms_p99": round(float(np.percentile(ms, 99)), 2),
+        "ms_per_text": round(elapsed * 1000 / max(n_texts, 1), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score sentences with the fine-tuned FinBERT sentiment model.")
+    parser.add_argument("input", help="txt (one sentence per line), .jsonl or .csv file; '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output .csv or .jsonl file (default: stdout)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="output format (default: from the output extension, else csv)")
+    parser.add_argument("--text-column", default="text", help="text column/field for .csv and .jsonl input")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--tokenizer", default=BASE_MODEL)
+    parser.add_argument("--backend", default=BACKEND, choices=BACKENDS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--threads", type=int, help="torch intra-op threads")
+    parser.add_argument("--include-text", action="store_true", help="repeat the input text in the output")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("jsonl" if args.output.lower().endswith(".jsonl") else "csv")
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    print(f"🔹 Loading {args.model_dir} ({args.backend} backend)...", file=sys.stderr)
+    from transformers import AutoTokenizer   # deferred: --help and bad arguments return at once
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+    model = load_model(args.model_dir, backend=args.backend)
+    id2label = model.config.id2label
+    labels = [id2label[i] for i in range(model.config.num_labels)]
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    writer = ScoreWriter(out, fmt, labels, args.include_text)
+    batch_seconds, n_texts = [], 0
+    t0 = time.perf_counter()
+    try:
+        for texts in read_chunks(args.input, args.chunk_size, args.text_column):
+            probs = predict_proba(model, tokenizer, texts, args.batch_size, args.max_length, batch_seconds)
+            writer.write(n_texts, texts, probs)
+            n_texts += len(texts)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    summary = summarize(n_texts, time.perf_counter() - t0, batch_seconds, args.batch_size)
+
+    print(f"✅ Scored {summary['texts']} texts in {summary['seconds']}s "
+          f"({summary['texts_per_sec']} texts/s, {summary['ms_per_text']} ms/text) | batch latency "
+          f"p50 {summary['batch_latency_ms_p50']} ms, p95 {summary['batch_latency_ms_p95']} ms, "
+          f"p99 {summary['batch_latency_ms_p99']} ms", file=sys.stderr)
+    print(json.dumps(summary), file=sys.stderr)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# a:\Infosys\scripts\segment_store.py
+"""
+Append-only store for the section texts of a whole corpus: two files per
+store directory instead of one .txt file per section span.
+
+    segments.bin          UTF-8 section texts, concatenated
+    segments_index.csv    doc,label,start_page,end_page,offset,length,write_id
+
+offset and length are byte positions in segments.bin. Every append()
+writes a document's sections with a new write_id. When a document is
+re-segmented, readers only see the entries of its latest write. The old
+bytes stay in the blob until the store is rebuilt.
+
+Readers memory-map segments.bin. view() returns a memoryview slice of
+the map (no copy), and text() decodes it. The index is a small CSV,
+re-read only when it grows.
+"""
+import os
+import csv
+import mmap
+from collections import namedtuple
+
+BLOB_NAME = "segments.bin"
+INDEX_NAME = "segments_index.csv"
+INDEX_COLUMNS = ["doc", "label", "start_page", "end_page", "offset", "length", "write_id"]
+
+SegmentEntry = namedtuple("SegmentEntry", INDEX_COLUMNS)
+
+
+class SegmentStore:
+    def __init__(self, root):
+        self.root = root
+        self.blob_path = os.path.join(root, BLOB_NAME)
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self._blob = None
+        self._map = None
+        self._index_size = -1
+        self._latest = {}      # doc -> [SegmentEntry] of its latest write
+        self._next_write_id = 0
+
+    # --- writing (one writer process at a time) ---
+    def append(self, doc, sections):
+        """
+        Stores `sections` [(label, start_page, end_page, text)] as the
+        current version of `doc`. Returns the new SegmentEntry rows.
+        """
+        self._load_index()
+        os.makedirs(self.root, exist_ok=True)
+        write_id = self._next_write_id
+        entries = []
+        with open(self.blob_path, "ab") as blob:
+            offset = blob.tell()
+            for label, start_page, end_page, text in sections:
+                data = text.encode("utf-8")
+                blob.write(data)
+                entries.append(SegmentEntry(doc, label, int(start_page), int(end_page), offset, len(data), write_id))
+                offset += len(data)
+        # the index is written after the text, so a crash in between only leaves unreferenced bytes
+        new_index = not os.path.exists(self.index_path)
+        with open(self.index_path, "a", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            if new_index:
+                writer.writerow(INDEX_COLUMNS)
+            writer.writerows(entries)
+        if entries:
+            self._latest[doc] = entries
+        self._next_write_id = write_id + 1
+        self._index_size = os.path.getsize(self.index_path)
+        return entries
+
+    # --- reading ---
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        size = os.path.getsize(self.index_path)
+        if size == self._index_size:
+            return
+        latest = {}
+        with open(self.index_path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                entry = SegmentEntry(row["doc"], row["label"], int(row["start_page"]), int(row["end_page"]),
+                                     int(row["offset"]), int(row["length"]), int(row["write_id"]))
+                current = latest.get(entry.doc)
+                if current is None or entry.write_id > current[0].write_id:
+                    latest[entry.doc] = [entry]
+                elif entry.write_id == current[0].write_id:
+                    current.append(entry)
+                self._next_write_id = max(self._next_write_id, entry.write_id + 1)
+        self._latest = latest
+        self._index_size = size
+
+    def docs(self):
+        self._load_index()
+        return sorted(self._latest)
+
+    def entries(self, doc=None, label=None):
+        """Current entries, optionally for one document and/or label, in storage order."""
+        self._load_index()
+        docs = [doc] if doc is not None else sorted(self._latest)
+        return [e for d in docs for e in self._latest.get(d, []) if label is None or e.label == label]
+
+    def _mapped(self, end):
+        # (re)map when the blob has grown past the current map, e.g. after an append
+        if self._map is None or end > len(self._map):
+            self._close_map()
+            self._blob = open(self.blob_path, "rb")
+            self._map = mmap.mmap(self._blob.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def view(self, entry):
+        """The entry's UTF-8 bytes as a memoryview into the mapped blob (no copy)."""
+        if entry.length == 0:
+            return memoryview(b"")
+        return memoryview(self._mapped(entry.offset + entry.length))[entry.offset:entry.offset + entry.length]
+
+    def text(self, entry):
+        return str(self.view(entry), "utf-8")
+
+    def _close_map(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass   # memoryviews handed out still point into it; freed with them
+            self._blob.close()
+        self._map = self._blob = None
+
+    def close(self):
+        self._close_map()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
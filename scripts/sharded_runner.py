@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+
+def threads_per_worker(num_workers):
+    """Split the machine's cores evenly so N workers x T threads never oversubscribe."""
+    return max(1, (os.cpu_count() or 1) // max(1, num_workers))
+
+
+def split_range(n, num_workers, shards_per_worker=4, min_size=1):
+    """
+    Contiguous (start, stop) ranges covering range(n): about
+    num_workers * shards_per_worker of them, each at least `min_size` long
+    (a single range when there is not enough work to split).
+    """
+    n_shards = max(1, min(num_workers * shards_per_worker, n // max(1, min_size)))
+    bounds = [n * i // n_shards for i in range(n_shards + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def map_ranges(fn, ranges, num_workers, *args):
+    """
+    [fn(*args, start, stop) for (start, stop) in ranges], in range order.
+    With num_workers > 1 and several ranges the calls run in a process
+    pool, otherwise in this process. `fn` must be a module-level function.
+    """
+    if num_workers <= 1 or len(ranges) <= 1:
+        return [fn(*args, start, stop) for start, stop in ranges]
+    with ProcessPoolExecutor(max_workers=min(num_workers, len(ranges))) as pool:
+        futures = [pool.submit(fn, *args, start, stop) for start, stop in ranges]
+        return [f.result() for f in futures]
+
+
+def _init_worker(num_threads, init_fn):
+    import torch
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # already fixed for this process
+    if init_fn is not None:
+        init_fn()   # load the model once per worker
+
+
+def _run_shard(process_fn, input_path, start, nrows, part_path):
+    t0 = time.perf_counter()
+    df = pd.read_csv(input_path, skiprows=range(1, start + 1), nrows=nrows)
+    df.index = pd.RangeIndex(start, start + len(df))   # row positions in input_path
+    result = process_fn(df)
+    tmp_path = part_path + ".tmp"
+    result.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, part_path)
+    return len(df), len(result), time.perf_counter() - t0
+
+
+def _count_rows(input_path):
+    return len(pd.read_csv(input_path, usecols=[0]))
+
+
+def run_sharded(input_path, output_path, process_fn, num_workers, init_fn=None,
+                num_threads=None, shards_per_worker=4, start_row=0, n_rows=None):
+    """
+    Splits rows [start_row, start_row + n_rows) of input_path into contiguous
+    shards and runs `process_fn(df) -> DataFrame` on them in a process pool.
+    Each shard's df is indexed by its rows' positions in input_path.
+
+    Every worker runs `init_fn` once (e.g. to load a model) with
+    torch.set_num_threads(num_threads); by default the cores are divided
+    evenly between workers. Shards are written to <output_path>.shards/ and
+    concatenated in input order, so the output matches a single-process run.
+    Finished shards are kept until the run completes, so a restarted run
+    with the same input and shard plan only redoes the missing ones.
+
+    `process_fn` and `init_fn` must be module-level functions (picklable).
+    """
+    total = _count_rows(input_path) - start_row
+    n_rows = total if n_rows is None else min(n_rows, total)
+    num_threads = num_threads or threads_per_worker(num_workers)
+    n_shards = max(1, min(n_rows, num_workers * shards_per_worker))
+    bounds = [start_row + n_rows * i // n_shards for i in range(n_shards + 1)]
+
+    shard_dir = output_path + ".shards"
+    plan = {"input": input_path, "input_bytes": os.path.getsize(input_path),
+            "input_mtime": os.path.getmtime(input_path), "bounds": bounds}
+    plan_path = os.path.join(shard_dir, "plan.json")
+    if os.path.exists(plan_path):
+        with open(plan_path, "r", encoding="utf-8") as f:
+            if json.load(f) != plan:
+                shutil.rmtree(shard_dir)
+    os.makedirs(shard_dir, exist_ok=True)
+    with open(plan_path, "w", encoding="utf-8") as f:
+        json.dump(plan, f)
+
+    part_paths = [os.path.join(shard_dir, f"part_{i:05d}.csv") for i in range(n_shards)]
+    todo = [i for i in range(n_shards) if not os.path.exists(part_paths[i])]
+    print(f"🔹 {n_rows} rows in {n_shards} shards ({n_shards - len(todo)} already done), "
+          f"{num_workers} workers x {num_threads} threads")
+
+    t0 = time.perf_counter()
+    if todo:
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker,
+                                 initargs=(num_threads, init_fn)) as pool:
+            futures = {i: pool.submit(_run_shard, process_fn, input_path, bounds[i],
+                                      bounds[i + 1] - bounds[i], part_paths[i]) for i in todo}
+            for i in todo:
+                rows_in, rows_out, seconds = futures[i].result()
+                print(f"  shard {i + 1}/{n_shards}: {rows_in} rows -> {rows_out} results in {seconds:.1f}s")
+
+    # --- concatenate parts in shard order, header once ---
+    with open(output_path, "w", encoding="utf-8", newline="") as out:
+        for i, part in enumerate(part_paths):
+            with open(part, "r", encoding="utf-8", newline="") as f:
+                header = f.readline()
+                if i == 0:
+                    out.write(header)
+                shutil.copyfileobj(f, out)
+    shutil.rmtree(shard_dir)
+    elapsed = time.perf_counter() - t0
+    print(f"✅ Sharded run finished in {elapsed:.1f}s ({n_rows / max(elapsed, 1e-9):.1f} rows/sec)")
+    return output_path
@@ -1,18 +1,10 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, TextClassificationPipeline
-import torch
+import os
+from inference_backends import load_model, predict_proba
 
 # Folder where your fine-tuned weights are saved
 MODEL_DIR = r"A:\Infosys\models\finbert_finetuned"
 BASE_MODEL = "yiyanghkust/finbert-tone"
-
-print("🔹 Loading base FinBERT tokenizer...")
-tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL)
-
-print("🔹 Loading fine-tuned model weights...")
-model = AutoModelForSequenceClassification.from_pretrained(MODEL_DIR)
-
-# Build pipeline for inference
-pipe = TextClassificationPipeline(model=model, tokenizer=tokenizer, return_all_scores=True, device=-1)
+BACKEND = os.environ.get("FINBERT_BACKEND", "pytorch")  # pytorch | quantized | onnx | onnx-int8
 
 # Example test sentences
 texts = [
@@ -22,10 +14,25 @@ texts = [
     "Investors were disappointed by the declining sales figures."
 ]
 
-print("\n🔹 Making predictions...\n")
-for t in texts:
-    preds = pipe(t)
-    print(f"Text: {t}")
-    for p in preds[0]:
-        print(f"  {p['label']}: {p['score']:.4f}")
-    print()
+
+def main():
+    from transformers import AutoTokenizer   # deferred: importing this module stays cheap
+
+    print("🔹 Loading base FinBERT tokenizer...")
+    tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL)
+
+    print(f"🔹 Loading fine-tuned model weights ({BACKEND} backend)...")
+    model = load_model(MODEL_DIR, backend=BACKEND)
+    id2label = model.config.id2label
+
+    print("\n🔹 Making predictions...\n")
+    all_probs = predict_proba(model, tokenizer, texts)   # one batched call for all sentences
+    for t, probs in zip(texts, all_probs):
+        print(f"Text: {t}")
+        for i, score in enumerate(probs):
+            print(f"  {id2label[i]}: {score:.4f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# a:\Infosys\scripts\test_quote_fetcher.py
+"""
+ConcurrentFetcher against stub providers (no network): rate limiting,
+retries, timeouts of hung calls, and HttpProvider's request timeout
+against a local stub server.
+
+Run from the scripts folder: python -m unittest test_quote_fetcher
+"""
+import json
+import time
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from quote_cache import QuoteCache, make_provider
+from quote_fetcher import ConcurrentFetcher
+
+
+class StubProvider:
+    """
+    fetch(ticker) -> quote. `fail_first[ticker]` calls raise ConnectionError,
+    tickers in `hung` block until `release` is set, `unknown` raise KeyError.
+    Every call's start time is logged.
+    """
+    name = "stub"
+
+    def __init__(self, fail_first=None, hung=(), unknown=()):
+        self.fail_first = dict(fail_first or {})
+        self.hung = set(hung)
+        self.unknown = set(unknown)
+        self.release = threading.Event()
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def fetch(self, ticker):
+        with self.lock:
+            self.calls.append((ticker, time.monotonic()))
+            failures_left = self.fail_first.get(ticker, 0)
+            if failures_left:
+                self.fail_first[ticker] = failures_left - 1
+        if ticker in self.unknown:
+            raise KeyError(ticker)
+        if ticker in self.hung:
+            self.release.wait()
+        if failures_left:
+            raise ConnectionError(f"{ticker} flaked")
+        return {"current_price": 101.0, "previous_close": 100.0, "market_cap": None}
+
+
+class ConcurrentFetcherTest(unittest.TestCase):
+
+    def test_rate_limit(self):
+        rate, n = 50, 100
+        provider = StubProvider()
+        fetcher = ConcurrentFetcher(max_workers=16, rate_per_sec=rate, timeout=5.0, retries=0)
+        results = fetcher.fetch_many(provider, [f"T{i}" for i in range(n)])
+
+        self.assertTrue(all(results.values()))
+        starts = sorted(t for _, t in provider.calls)
+        # a full bucket (capacity = rate) goes out at once, then one call per 1/rate seconds
+        for i in range(rate, n):
+            self.assertGreaterEqual(starts[i] - starts[0], (i + 1 - rate) / rate - 0.02)
+        self.assertEqual(fetcher.summary()["failed"], 0)
+
+    def test_retries_then_success(self):
+        provider = StubProvider(fail_first={"AAPL": 2})
+        fetcher = ConcurrentFetcher(max_workers=2, timeout=1.0, retries=3, backoff=0.01)
+        results = fetcher.fetch_many(provider, ["AAPL", "MSFT"])
+
+        self.assertEqual(results["AAPL"]["current_price"], 101.0)
+        records = {r["ticker"]: r for r in fetcher.records}
+        self.assertEqual(records["AAPL"]["attempts"], 3)
+        self.assertIsNone(records["AAPL"]["error"])
+        self.assertEqual(records["MSFT"]["attempts"], 1)
+        self.assertEqual(fetcher.summary()["retries"], 2)
+
+    def test_retries_exhausted_and_unknown_ticker(self):
+        provider = StubProvider(fail_first={"TSLA": 10}, unknown={"NOPE"})
+        fetcher = ConcurrentFetcher(max_workers=2, timeout=1.0, retries=2, backoff=0.01)
+        results = fetcher.fetch_many(provider, ["TSLA", "NOPE"])
+
+        self.assertIsNone(results["TSLA"])
+        self.assertIsNone(results["NOPE"])
+        records = {r["ticker"]: r for r in fetcher.records}
+        self.assertEqual(records["TSLA"]["attempts"], 3)
+        self.assertIn("ConnectionError", records["TSLA"]["error"])
+        # unknown tickers are not retried
+        self.assertEqual(records["NOPE"]["attempts"], 1)
+        self.assertIn("KeyError", records["NOPE"]["error"])
+        self.assertEqual(fetcher.summary()["failed"], 2)
+
+    def test_hung_calls_do_not_starve_later_calls(self):
+        # many more hung calls than workers: abandoned calls must not hold workers
+        hung = [f"HUNG{i}" for i in range(12)]
+        ok = [f"OK{i}" for i in range(12)]
+        provider = StubProvider(hung=hung)
+        fetcher = ConcurrentFetcher(max_workers=2, timeout=0.1, retries=1, backoff=0.01)
+        try:
+            t0 = time.perf_counter()
+            results = fetcher.fetch_many(provider, hung + ok)
+            elapsed = time.perf_counter() - t0
+
+            self.assertTrue(all(results[t] is not None for t in ok))
+            self.assertTrue(all(results[t] is None for t in hung))
+            records = {r["ticker"]: r for r in fetcher.records}
+            self.assertEqual(records["HUNG0"]["attempts"], 2)
+            self.assertIn("timeout", records["HUNG0"]["error"])
+            # 12 hung tickers x 2 attempts x 0.1s over 2 workers, plus backoff
+            self.assertLess(elapsed, 3.0)
+            summary = fetcher.summary()
+            self.assertEqual(summary["abandoned_calls"], 24)
+            self.assertEqual(summary["abandoned_still_running"], 24)
+        finally:
+            provider.release.set()
+        deadline = time.monotonic() + 2.0
+        while fetcher.abandoned_running and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(fetcher.abandoned_running, 0)
+
+    def test_quote_cache_with_fetcher(self):
+        provider = StubProvider(unknown={"NOPE"})
+        cache = QuoteCache(provider, fetcher=ConcurrentFetcher(max_workers=4, retries=0))
+        quotes = cache.get_many(["AAPL", "AAPL", "NOPE"])
+
+        self.assertEqual(quotes["AAPL"]["current_price"], 101.0)
+        self.assertIsNone(quotes["NOPE"]["current_price"])
+        self.assertEqual(sum(t == "AAPL" for t, _ in provider.calls), 1)
+
+
+class SlowQuoteHandler(BaseHTTPRequestHandler):
+    delay = 1.0
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        body = json.dumps({"current_price": 1.0, "previous_close": 1.0, "market_cap": 1}).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass    # client already gave up
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpProviderTimeoutTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), SlowQuoteHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/quotes"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_request_times_out(self):
+        provider = make_provider("http", url=self.url, timeout=0.2)
+        fetcher = ConcurrentFetcher(max_workers=2, timeout=5.0, retries=0)
+        t0 = time.perf_counter()
+        results = fetcher.fetch_many(provider, ["AAPL"])
+
+        self.assertIsNone(results["AAPL"])
+        self.assertLess(time.perf_counter() - t0, 0.9)
+        # the request itself timed out, nothing was left running
+        self.assertEqual(fetcher.abandoned, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import json
+import shutil
+import hashlib
+import pandas as pd
+
+CACHE_VERSION = 1
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(data_path, tokenizer_name, max_length, text_column="text"):
+    payload = json.dumps([file_sha256(data_path), tokenizer_name, max_length, text_column, CACHE_VERSION])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def load_tokenized(data_path, tokenizer_name, max_length=128, text_column="text", cache_dir=None):
+    """
+    Tokenized copy of `data_path` (one row per CSV row, same order) with the
+    columns text, input_ids, attention_mask[, token_type_ids] and length.
+    Sequences are truncated but not padded.
+
+    The first call tokenizes and saves an Arrow dataset under
+    <data dir>/token_cache/<key>, keyed by the file's content hash, the
+    tokenizer and max_length. Later calls, from any script, load it with
+    load_from_disk, which memory-maps the Arrow files: no tokenization, and
+    processes reading the same cache share its pages.
+    """
+    from datasets import Dataset, load_from_disk   # deferred: importing this module stays cheap
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(data_path)), "token_cache")
+    path = os.path.join(cache_dir, cache_key(data_path, tokenizer_name, max_length, text_column))
+    if os.path.isdir(path):
+        print(f"🔹 Loading tokenized dataset from cache: {path}")
+        return load_from_disk(path)
+
+    print(f"🔹 Tokenizing {data_path} with {tokenizer_name} (max_length={max_length})...")
+    texts = pd.read_csv(data_path)[text_column].astype(str)
+    dataset = Dataset.from_pandas(pd.DataFrame({"text": texts}), preserve_index=False)
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+
+    def tokenize(batch):
+        enc = tokenizer(batch["text"], truncation=True, max_length=max_length)
+        enc["length"] = [len(ids) for ids in enc["input_ids"]]
+        return enc
+
+    dataset = dataset.map(tokenize, batched=True)
+    tmp_path = path + ".tmp"
+    if os.path.isdir(tmp_path):
+        shutil.rmtree(tmp_path)
+    dataset.save_to_disk(tmp_path)
+    os.replace(tmp_path, path)
+    print(f"💾 Token cache saved: {path}")
+    return load_from_disk(path)
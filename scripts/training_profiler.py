@@ -0,0 +1,170 @@
+import os
+import sys
+import json
+import time
+import torch
+from transformers import TrainerCallback
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if it cannot be read)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:  # Windows
+        try:
+            import psutil
+            info = psutil.Process().memory_info()
+            return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+        except ImportError:
+            return None
+
+
+def _now():
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    return time.perf_counter()
+
+
+class ThroughputProfilerCallback(TrainerCallback):
+    """
+    Records where training time goes: samples/sec, tokens/sec (real vs
+    padded), a per-step breakdown into data loading, forward, backward and
+    optimizer time, and peak RSS. Forward time and token counts come from
+    hooks on the model; the other phases from the Trainer callback events.
+    The report is printed at every logging step and written as JSON when
+    training ends.
+
+    `profile_steps=(start, end)` additionally captures a torch.profiler
+    trace of those global steps into `trace_dir` (TensorBoard format).
+    """
+
+    def __init__(self, report_path=None, profile_steps=None, trace_dir=None):
+        self.report_path = report_path
+        self.profile_steps = profile_steps
+        self.trace_dir = trace_dir
+        self.totals = {"data": 0.0, "forward": 0.0, "backward": 0.0, "optimizer": 0.0, "step": 0.0}
+        self.steps = 0
+        self.samples = 0
+        self.real_tokens = 0
+        self.padded_tokens = 0
+        self._hooks = []
+        self._profiler = None
+        self._has_optimizer_events = False
+
+    # --- model hooks: forward time and token counts (training forwards only) ---
+    def _pre_forward(self, module, args, kwargs):
+        if not module.training:
+            return
+        input_ids = kwargs.get("input_ids", args[0] if args else None)
+        if input_ids is not None:
+            mask = kwargs.get("attention_mask")
+            self.samples += input_ids.shape[0]
+            self.padded_tokens += input_ids.numel()
+            self.real_tokens += int(mask.sum()) if mask is not None else input_ids.numel()
+        self._forward_start = _now()
+
+    def _post_forward(self, module, args, output):
+        if not module.training:
+            return
+        self._forward_end = _now()
+        self._step_forward += self._forward_end - self._forward_start
+
+    def on_train_begin(self, args, state, control, model=None, **kwargs):
+        self._hooks = [
+            model.register_forward_pre_hook(self._pre_forward, with_kwargs=True),
+            model.register_forward_hook(self._post_forward),
+        ]
+        if self.report_path is None:
+            self.report_path = os.path.join(args.output_dir, "throughput_report.json")
+        if self.trace_dir is None:
+            self.trace_dir = os.path.join(args.logging_dir or args.output_dir, "profiler")
+        self._last_step_end = _now()
+
+    def on_step_begin(self, args, state, control, **kwargs):
+        self._step_start = _now()
+        self._step_data = self._step_start - self._last_step_end
+        self._step_forward = 0.0
+        self._optimizer_start = None
+        if self.profile_steps and state.global_step == self.profile_steps[0]:
+            activities = [torch.profiler.ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(torch.profiler.ProfilerActivity.CUDA)
+            self._profiler = torch.profiler.profile(
+                activities=activities,
+                schedule=torch.profiler.schedule(wait=0, warmup=1, active=max(1, self.profile_steps[1] - self.profile_steps[0] - 1)),
+                on_trace_ready=torch.profiler.tensorboard_trace_handler(self.trace_dir),
+                record_shapes=True,
+                profile_memory=True,
+            )
+            self._profiler.start()
+
+    def on_pre_optimizer_step(self, args, state, control, **kwargs):
+        self._has_optimizer_events = True
+        self._optimizer_start = _now()
+
+    def on_step_end(self, args, state, control, **kwargs):
+        end = _now()
+        step_time = end - self._step_start
+        if self._optimizer_start is not None:
+            backward = self._optimizer_start - self._step_start - self._step_forward
+            optimizer = end - self._optimizer_start
+        else:
+            # older transformers: no pre-optimizer event, backward includes the optimizer
+            backward = step_time - self._step_forward
+            optimizer = 0.0
+        self.totals["data"] += self._step_data
+        self.totals["forward"] += self._step_forward
+        self.totals["backward"] += backward
+        self.totals["optimizer"] += optimizer
+        self.totals["step"] += step_time + self._step_data
+        self.steps += 1
+        self._last_step_end = end
+
+        if self._profiler is not None:
+            self._profiler.step()
+            if state.global_step >= self.profile_steps[1]:
+                self._stop_profiler()
+
+    def _stop_profiler(self):
+        self._profiler.stop()
+        self._profiler = None
+        print(f"🔍 torch.profiler trace saved under {self.trace_dir}")
+
+    def report(self):
+        total = self.totals["step"] or 1e-9
+        breakdown = {k: {"ms_per_step": round(1000 * v / max(self.steps, 1), 2), "share": round(v / total, 4)}
+                     for k, v in self.totals.items() if k != "step"}
+        if not self._has_optimizer_events:
+            breakdown["backward"]["note"] = "includes optimizer step"
+        rss = peak_rss_mb()
+        return {
+            "steps": self.steps,
+            "samples_per_sec": round(self.samples / total, 2),
+            "real_tokens_per_sec": round(self.real_tokens / total, 1),
+            "padded_tokens_per_sec": round(self.padded_tokens / total, 1),
+            "padding_ratio": round(1 - self.real_tokens / self.padded_tokens, 4) if self.padded_tokens else 0.0,
+            "step_time_breakdown": breakdown,
+            "peak_rss_mb": round(rss, 1) if rss is not None else None,
+        }
+
+    def on_log(self, args, state, control, logs=None, **kwargs):
+        if self.steps:
+            r = self.report()
+            parts = " | ".join(f"{k} {v['share']:.0%}" for k, v in r["step_time_breakdown"].items())
+            print(f"⏱️ step {state.global_step}: {r['samples_per_sec']} samples/s, "
+                  f"{r['real_tokens_per_sec']} real / {r['padded_tokens_per_sec']} padded tokens/s | {parts}")
+
+    def on_train_end(self, args, state, control, **kwargs):
+        if self._profiler is not None:
+            self._stop_profiler()
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = []
+        report = self.report()
+        os.makedirs(os.path.dirname(self.report_path) or ".", exist_ok=True)
+        with open(self.report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Throughput report saved to {self.report_path}")
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,118 @@
+import random
+import torch
+from torch.utils.data import Sampler
+from transformers import Trainer, DataCollatorWithPadding
+from transformers.trainer_pt_utils import LengthGroupedSampler, get_length_grouped_indices
+
+
+def padding_ratio(lengths, batch_size, order=None, max_length=None):
+    """
+    Fraction of token slots in the batches that are padding.
+    With `max_length` every batch is padded to it (padding='max_length'),
+    otherwise each batch is padded to its own longest sequence.
+    """
+    order = list(range(len(lengths)) if order is None else order)
+    real = slots = 0
+    for start in range(0, len(order), batch_size):
+        batch = [lengths[i] for i in order[start:start + batch_size]]
+        real += sum(batch)
+        slots += (max_length or max(batch)) * len(batch)
+    return 1 - real / slots if slots else 0.0
+
+
+def report_padding(lengths, batch_size, max_length, seed=42):
+    """Prints and returns the padding ratio of the old and new batching schemes."""
+    generator = torch.Generator().manual_seed(seed)
+    shuffled = torch.randperm(len(lengths), generator=generator).tolist()
+    grouped = list(LengthGroupedSampler(batch_size, lengths=lengths, generator=generator))
+    ratios = {
+        "max_length": padding_ratio(lengths, batch_size, max_length=max_length),
+        "dynamic_shuffled": padding_ratio(lengths, batch_size, order=shuffled),
+        "dynamic_length_grouped": padding_ratio(lengths, batch_size, order=grouped),
+    }
+    print(f"🔹 Padding ratio at batch size {batch_size}: "
+          f"padding='max_length' {ratios['max_length']:.1%} | "
+          f"dynamic {ratios['dynamic_shuffled']:.1%} | "
+          f"dynamic + length-grouped {ratios['dynamic_length_grouped']:.1%}")
+    return ratios
+
+
+class WeightedLengthGroupedSampler(Sampler):
+    """
+    Draws `num_samples` indices with replacement, with probability
+    proportional to `weights` (e.g. 1 / class count for balanced classes),
+    then orders the draw like LengthGroupedSampler: shuffled megabatches,
+    each sorted by length, so batches hold sequences of similar size.
+    """
+
+    def __init__(self, weights, lengths, batch_size, num_samples=None, generator=None):
+        self.weights = torch.as_tensor(weights, dtype=torch.double)
+        self.lengths = list(lengths)
+        self.batch_size = batch_size
+        self.num_samples = num_samples or len(self.lengths)
+        self.generator = generator
+
+    def __len__(self):
+        return self.num_samples
+
+    def __iter__(self):
+        drawn = torch.multinomial(self.weights, self.num_samples, replacement=True, generator=self.generator).tolist()
+        order = get_length_grouped_indices([self.lengths[i] for i in drawn], self.batch_size, generator=self.generator)
+        return iter([drawn[i] for i in order])
+
+
+class AugmentingCollator:
+    """
+    DataCollatorWithPadding that augments on the fly: each example with a
+    'text' field is passed through `augment_fn` with probability `p`, and only
+    texts that actually changed are tokenized again. Columns other than the
+    model inputs and labels are dropped, so use it with
+    remove_unused_columns=False. Examples without 'text' (e.g. eval sets)
+    are only padded.
+    """
+
+    MODEL_KEYS = ("input_ids", "token_type_ids", "attention_mask", "labels")
+
+    def __init__(self, tokenizer, augment_fn, p=0.5, max_length=128, seed=42):
+        self.tokenizer = tokenizer
+        self.augment_fn = augment_fn
+        self.p = p
+        self.max_length = max_length
+        self.rng = random.Random(seed)
+        self.pad = DataCollatorWithPadding(tokenizer)
+
+    def __call__(self, features):
+        batch = []
+        for feature in features:
+            item = {k: feature[k] for k in self.MODEL_KEYS if k in feature}
+            text = feature.get("text")
+            if text is not None and self.rng.random() < self.p:
+                aug_text = self.augment_fn(text)
+                if aug_text != text:
+                    enc = self.tokenizer(aug_text, truncation=True, max_length=self.max_length)
+                    item.update({k: v for k, v in enc.items() if k in item})
+            batch.append(item)
+        return self.pad(batch)
+
+
+class LengthGroupedTrainer(Trainer):
+    """
+    Trainer whose train batches are drawn by a LengthGroupedSampler over the
+    dataset's 'length' column, so dynamic padding (DataCollatorWithPadding)
+    pads each batch only to sequences of similar size. Works the same across
+    transformers versions that spell group_by_length differently.
+
+    With `sample_weights` (one per train row) batches come from a
+    WeightedLengthGroupedSampler instead, e.g. to balance classes by
+    sampling rather than by duplicating rows.
+    """
+
+    def __init__(self, *args, sample_weights=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sample_weights = sample_weights
+
+    def _get_train_sampler(self, *args, **kwargs):
+        batch_size = self.args.train_batch_size * self.args.gradient_accumulation_steps
+        if self.sample_weights is not None:
+            return WeightedLengthGroupedSampler(self.sample_weights, self.train_dataset["length"], batch_size)
+        return LengthGroupedSampler(batch_size, lengths=self.train_dataset["length"])
@@ -1,14 +1,22 @@
 import re
 import json
-from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
 
-# Load your fine-tuned NER model and tokenizer
+# Your fine-tuned NER model and tokenizer
 MODEL_NAME = "path/to/your/finbert-ner-model"  # update with your model path or HuggingFace model ID
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModelForTokenClassification.from_pretrained(MODEL_NAME)
 
-# Initialize NER pipeline
-ner_pipeline = pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+# NER pipeline, created on first use (extract_entities_regex alone never loads transformers)
+_ner_pipeline = None
+
+
+def get_ner_pipeline():
+    global _ner_pipeline
+    if _ner_pipeline is None:
+        from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+        model = AutoModelForTokenClassification.from_pretrained(MODEL_NAME)
+        _ner_pipeline = pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+    return _ner_pipeline
+
 
 # Predefined regex patterns for custom financial entities (expand as needed)
 REGEX_PATTERNS = {
@@ -24,7 +32,7 @@ def extract_entities_ner(text):
     Extract entities using the fine-tuned NER model.
     Returns a dictionary of recognized entities grouped by entity label.
     """
-    ner_results = ner_pipeline(text)
+    ner_results = get_ner_pipeline()(text)
     entities = {}
     for ent in ner_results:
         label = ent['entity_group']
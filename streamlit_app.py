@@ -1,15 +1,35 @@
 import streamlit as st
 import pandas as pd
 import os
-import json
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from segment_store import SegmentStore
 # === Paths (Docker) ===
-SEGMENT_DIR = "/app/outputs/doc_segments"
+SEGMENT_DIR = "/app/outputs/doc_segments"   # segment store written by 05_segment_reports.py / ingest_reports.py
 TABLE_INDEX = "/app/outputs/tables/tables_index.csv"
 EVENTS = "/app/outputs/financial_events_extracted.csv"
 VERIFIED = "/app/outputs/financial_events_verified.csv"
 NER_ERRORS = "/app/outputs/eda/fiqa_errors.csv"
 
 
+# Streamlit reruns this script on every widget change; files are parsed once
+# and reused until they change on disk (the mtime is part of the cache key).
+@st.cache_data
+def _read_csv(path, mtime):
+    return pd.read_csv(path)
+
+
+def read_csv(path):
+    return _read_csv(path, os.path.getmtime(path))
+
+
+@st.cache_resource
+def get_segment_store():
+    # one memory map shared by all reruns and sessions; new appends are picked up on read
+    return SegmentStore(SEGMENT_DIR)
+
+
 st.set_page_config(page_title="Financial Document Analyzer", layout="wide")
 
 st.title("📘 Financial Document Analysis Dashboard")
@@ -17,38 +37,32 @@ st.write("This interface allows you to explore segmented sections, extracted tab
 
 # --- Segmented Sections ---
 st.header("📄 Segmented Report Sections")
-json_files = [f for f in os.listdir(SEGMENT_DIR) if f.endswith("_sections.json")]
+store = get_segment_store()
+docs = store.docs()
 
-if json_files:
-    selected_json = st.selectbox("Select segmented JSON:", json_files)
-    json_path = os.path.join(SEGMENT_DIR, selected_json)
-    data = json.load(open(json_path, "r"))
+if docs:
+    selected_doc = st.selectbox("Select document:", docs)
+    entries = store.entries(selected_doc)
 
     st.subheader("Detected Sections")
-    st.json(data["sections"])
+    st.dataframe(pd.DataFrame(entries)[["label", "start_page", "end_page", "length"]])
 
-    selected_section = st.selectbox("Open Section Text", list(data["sections"].keys()))
+    selected_section = st.selectbox("Open Section Text", entries,
+                                    format_func=lambda e: f"{e.label} (pages {e.start_page}-{e.end_page})")
     if selected_section:
-        entry = data["sections"][selected_section][0]["text_path"]
-
-# Fix Windows path in JSON → convert to Docker path
-        entry = entry.replace("A:\\Infosys\\outputs", "/app/outputs").replace("\\", "/")
-
-        with open(entry, "r", encoding="utf-8") as f:
-            text = f.read()
-        st.text_area(selected_section, text, height=300)
+        st.text_area(selected_section.label, store.text(selected_section), height=300)
 else:
     st.info("No segmented sections found. Run 05_segment_reports.py first.")
 
 # --- Tables ---
 st.header("📊 Extracted Financial Tables")
 if os.path.exists(TABLE_INDEX):
-    idx_df = pd.read_csv(TABLE_INDEX)
+    idx_df = read_csv(TABLE_INDEX)
     if len(idx_df) > 0:
         st.dataframe(idx_df)
 
         chosen = st.selectbox("Preview a table", idx_df["csv_path"])
-        st.write(pd.read_csv(chosen))
+        st.write(read_csv(chosen))
     else:
         st.warning("No tables found in this document.")
 else:
@@ -57,7 +71,7 @@ else:
 # --- Events ---
 st.header("📌 Financial Event Extraction")
 if os.path.exists(EVENTS):
-    events_df = pd.read_csv(EVENTS)
+    events_df = read_csv(EVENTS)
     st.dataframe(events_df.head(50))
 else:
     st.info("Events file not found. Run 03_event_extraction.py.")
@@ -65,7 +79,7 @@ else:
 # --- Verified Events ---
 st.header("💹 Verified Events With Stock Data")
 if os.path.exists(VERIFIED):
-    vdf = pd.read_csv(VERIFIED)
+    vdf = read_csv(VERIFIED)
     st.dataframe(vdf)
 else:
     st.info("Verified events not found. Run 04_integrate_yfinance.py.")
@@ -73,7 +87,7 @@ else:
 # --- NER Errors ---
 st.header("🚫 NER Misclassifications")
 if os.path.exists(NER_ERRORS):
-    err_df = pd.read_csv(NER_ERRORS)
+    err_df = read_csv(NER_ERRORS)
     st.write(err_df.head(50))
 else:
     st.info("NER error file missing.")